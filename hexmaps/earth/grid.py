@@ -1,46 +1,170 @@
-import random
 from collections import deque
 from collections.abc import Mapping
-from dataclasses import dataclass, field
-from itertools import count
-from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type, Union
-
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import chain, count, repeat
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+import numpy as np
 from h3.api import basic_int, memview_int
+from hexmaps.earth.slots import SlottedDataclass
 from hexmaps.earth.spatial.geojson import BaseCollection, BaseFeature
-from hexmaps.earth.spatial.geometry import validate_wgs84_coordinates
-from hexmaps.earth.spatial.proj import WGS84_GEOD
+from hexmaps.earth.spatial.geometry import (
+    validate_wgs84_coordinate_array,
+    validate_wgs84_coordinates,
+)
+from hexmaps.earth.spatial.proj import (
+    WGS84_GEOD,
+    get_haversine_distance,
+    get_spherical_bearing,
+)
+from shapely.geometry import MultiPolygon as ShapelyMultiPolygon
 from shapely.geometry import Point as ShapelyPoint
 from shapely.geometry import Polygon as ShapelyPolygon
 
 H3IndexType = int
 
+_RANDOM_WALKER_BATCH_SIZE = 4096
+# H3 has exactly 12 pentagons per resolution and indexes encode their resolution,
+# so a single set answers is_pentagon for any cell without calling into h3
+_PENTAGON_INDEXES = frozenset(
+    chain.from_iterable(basic_int.get_pentagon_indexes(r) for r in range(16))
+)
+
+
+def _validate_coordinate_arrays(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+) -> np.ndarray:
+    # stacks the arrays into (N, 2) rows of (lon, lat) and validates them
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    if latitudes.shape != longitudes.shape:
+        raise ValueError("latitudes and longitudes must have the same shape")
+    coords = np.stack((longitudes.ravel(), latitudes.ravel()), axis=1)
+    return validate_wgs84_coordinate_array(coords)
+
+
+def geo_to_indexes(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    resolution: int,
+) -> np.ndarray:
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    if latitudes.shape != longitudes.shape:
+        raise ValueError("latitudes and longitudes must have the same shape")
+    # h3 v3 only exposes a scalar geo_to_h3, so feed it plain floats in one loop
+    it = map(
+        basic_int.geo_to_h3,
+        latitudes.ravel().tolist(),
+        longitudes.ravel().tolist(),
+        repeat(resolution),
+    )
+    indexes = np.fromiter(it, dtype=np.uint64, count=latitudes.size)
+    return indexes.reshape(latitudes.shape)
+
+
+@lru_cache(maxsize=1 << 16)
+def _get_sorted_neighbors(
+    index: H3IndexType,
+    bearing: float,
+) -> Tuple[Tuple[float, H3IndexType, float, float], ...]:
+    # the six geodesic azimuths are solved in a single vectorized call
+    lat, lng = memview_int.h3_to_geo(index)
+    neighbors = list(memview_int.hex_ring(index, 1))
+    coordinates = [memview_int.h3_to_geo(n) for n in neighbors]
+    neighbor_lats = np.array([c[0] for c in coordinates], dtype=np.float64)
+    neighbor_lngs = np.array([c[1] for c in coordinates], dtype=np.float64)
+    fwd, _, _ = WGS84_GEOD.inv(
+        np.full_like(neighbor_lngs, lng),
+        np.full_like(neighbor_lats, lat),
+        neighbor_lngs,
+        neighbor_lats,
+    )
+    angle_list = [
+        ((azimuth - bearing) % 360.0, neighbor, neighbor_lat, neighbor_lng)
+        for azimuth, neighbor, (neighbor_lat, neighbor_lng) in zip(
+            fwd.tolist(), neighbors, coordinates
+        )
+    ]
+    # angles within a ring never tie, so tuples sort on the angle alone
+    angle_list.sort()
+    return tuple(angle_list)
+
+
+class _SlottedFeature(SlottedDataclass, BaseFeature):
+    __slots__ = ()
+
 
 @dataclass(frozen=True)
-class Point(BaseFeature):
+class Point(_SlottedFeature):
+    __slots__ = ("longitude", "latitude")
+
     longitude: float
     latitude: float
 
     def __post_init__(self):
         validate_wgs84_coordinates(self.longitude, self.latitude)
 
+    @classmethod
+    def _from_h3_coordinates(
+        cls: Type["Point"],
+        latitude: float,
+        longitude: float,
+    ) -> "Point":
+        # h3 always returns valid WGS84 coordinates so validation is skipped
+        point = object.__new__(cls)
+        object.__setattr__(point, "longitude", longitude)
+        object.__setattr__(point, "latitude", latitude)
+        return point
+
+    @classmethod
+    def from_arrays(
+        cls: Type["Point"],
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+    ) -> Iterator["Point"]:
+        coords = _validate_coordinate_arrays(latitudes, longitudes)
+        return (
+            cls._from_h3_coordinates(latitude=lat, longitude=lon)
+            for lon, lat in coords.tolist()
+        )
+
     def get_index(self, resolution: int) -> H3IndexType:
         return memview_int.geo_to_h3(self.latitude, self.longitude, resolution)
 
     def get_geometry(self) -> ShapelyPoint:
         return ShapelyPoint(self.longitude, self.latitude)
 
+    def get_geometry_mapping(self) -> Dict[str, Any]:
+        return {"type": "Point", "coordinates": (self.longitude, self.latitude)}
+
     def get_properties(self) -> Dict[str, Any]:
         return {}
 
 
 @dataclass(frozen=True)
-class Cell(BaseFeature):
+class Cell(_SlottedFeature):
+    __slots__ = ("index", "_hash", "_point", "_geometry")
+
     index: H3IndexType
-    point: Point = field(init=False, repr=False)
 
     def __post_init__(self):
-        lat, lng = memview_int.h3_to_geo(self.index)
-        object.__setattr__(self, "point", Point(latitude=lat, longitude=lng))
+        object.__setattr__(self, "_hash", hash(self.index))
+        object.__setattr__(self, "_point", None)
+        object.__setattr__(self, "_geometry", None)
 
     def __eq__(self, other: "Cell") -> bool:
         if not isinstance(other, Cell):
@@ -48,39 +172,140 @@ class Cell(BaseFeature):
         return self.index == other.index
 
     def __hash__(self) -> int:
-        return hash(self.index)
+        return self._hash
 
     @classmethod
     def from_point(cls: Type["Cell"], point: Point, resolution: int) -> "Cell":
         return cls(index=point.get_index(resolution))
 
+    @classmethod
+    def from_indexes(
+        cls: Type["Cell"],
+        indexes: Union[np.ndarray, Iterable[H3IndexType]],
+    ) -> Iterator["Cell"]:
+        if isinstance(indexes, np.ndarray):
+            indexes = indexes.ravel().tolist()
+        return (cls(index=i) for i in indexes)
+
+    @classmethod
+    def _from_index_and_coordinates(
+        cls: Type["Cell"],
+        index: H3IndexType,
+        latitude: float,
+        longitude: float,
+    ) -> "Cell":
+        cell = cls(index=index)
+        point = Point._from_h3_coordinates(latitude, longitude)
+        object.__setattr__(cell, "_point", point)
+        return cell
+
+    @property
+    def point(self) -> Point:
+        if self._point is None:
+            lat, lng = memview_int.h3_to_geo(self.index)
+            object.__setattr__(self, "_point", Point._from_h3_coordinates(lat, lng))
+        return self._point
+
     @property
     def is_pentagon(self) -> bool:
-        return memview_int.h3_is_pentagon(self.index)
+        return self.index in _PENTAGON_INDEXES
 
-    def get_bearing(self, other: "Cell") -> float:
-        fwd, _, _ = WGS84_GEOD.inv(
+    def _geod_inv(
+        self,
+        lons: Union[float, np.ndarray],
+        lats: Union[float, np.ndarray],
+    ) -> Tuple[Union[float, np.ndarray], Union[float, np.ndarray]]:
+        lon, lat = self.point.longitude, self.point.latitude
+        if isinstance(lons, np.ndarray):
+            lon, lat = np.full_like(lons, lon), np.full_like(lats, lat)
+        fwd, _, dist = WGS84_GEOD.inv(lon, lat, lons, lats)
+        return fwd, dist
+
+    def _get_bearings(
+        self,
+        lons: Union[float, np.ndarray],
+        lats: Union[float, np.ndarray],
+        geodesic: bool,
+    ) -> Union[float, np.ndarray]:
+        if geodesic:
+            fwd, _ = self._geod_inv(lons, lats)
+            return fwd
+        return get_spherical_bearing(
             self.point.longitude,
             self.point.latitude,
-            other.point.longitude,
-            other.point.latitude,
+            lons,
+            lats,
         )
-        return fwd
 
-    def get_distance(self, other: "Cell") -> float:
-        _, _, dist = WGS84_GEOD.inv(
+    def _get_distances(
+        self,
+        lons: Union[float, np.ndarray],
+        lats: Union[float, np.ndarray],
+        geodesic: bool,
+    ) -> Union[float, np.ndarray]:
+        if geodesic:
+            _, dist = self._geod_inv(lons, lats)
+            return dist
+        return get_haversine_distance(
             self.point.longitude,
             self.point.latitude,
-            other.point.longitude,
-            other.point.latitude,
+            lons,
+            lats,
+        )
+
+    @staticmethod
+    def _get_coordinate_arrays(
+        cells: Iterable["Cell"],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        points = [c.point for c in cells]
+        lons = np.fromiter((p.longitude for p in points), np.float64, len(points))
+        lats = np.fromiter((p.latitude for p in points), np.float64, len(points))
+        return lons, lats
+
+    def get_bearing(self, other: "Cell", geodesic: bool = True) -> float:
+        return float(
+            self._get_bearings(
+                other.point.longitude,
+                other.point.latitude,
+                geodesic=geodesic,
+            )
         )
-        return dist
+
+    def get_distance(self, other: "Cell", geodesic: bool = True) -> float:
+        return float(
+            self._get_distances(
+                other.point.longitude,
+                other.point.latitude,
+                geodesic=geodesic,
+            )
+        )
+
+    def get_bearings(
+        self,
+        others: Iterable["Cell"],
+        geodesic: bool = True,
+    ) -> np.ndarray:
+        lons, lats = self._get_coordinate_arrays(others)
+        return self._get_bearings(lons, lats, geodesic=geodesic)
+
+    def get_distances(
+        self,
+        others: Iterable["Cell"],
+        geodesic: bool = True,
+    ) -> np.ndarray:
+        lons, lats = self._get_coordinate_arrays(others)
+        return self._get_distances(lons, lats, geodesic=geodesic)
 
     def get_neighbor_map(self, bearing: float = 0.0) -> Dict[int, "Neighbor"]:
-        it = map(Cell, memview_int.hex_ring(self.index, 1))
-        angle_it = (((self.get_bearing(n) - bearing) % 360.0, n) for n in it)
-        sorted_it = enumerate(sorted(angle_it, key=lambda x: x[0]))
-        return {i: Neighbor(cell=n, position=i, angle=a) for i, (a, n) in sorted_it}
+        sorted_it = enumerate(_get_sorted_neighbors(self.index, bearing))
+        return {
+            i: Neighbor(
+                cell=Cell._from_index_and_coordinates(n, lat, lng),
+                position=i,
+                angle=a,
+            )
+            for i, (a, n, lat, lng) in sorted_it
+        }
 
     def get_walker(
         self,
@@ -98,9 +323,23 @@ class Cell(BaseFeature):
     def get_random_walker(
         self,
         iterations: Optional[int] = None,
+        seed: Optional[int] = None,
     ) -> Iterator["Neighbor"]:
+        rng = np.random.default_rng(seed)
+        # draws are batched, bounded walks never allocate more than they use
+        size = _RANDOM_WALKER_BATCH_SIZE
+        if iterations is not None:
+            size = min(iterations, _RANDOM_WALKER_BATCH_SIZE)
+
+        def draw_it():
+            while True:
+                yield from rng.integers(0, 60, size=size).tolist()
+
+        draws = draw_it()
+
         def selector(cell, neighbor_map):
-            position = random.randrange(5 if cell.is_pentagon else 6)
+            # 60 is a multiple of both 5 and 6 so the modulo stays uniform
+            position = next(draws) % (5 if cell.is_pentagon else 6)
             return neighbor_map[position]
 
         return self.get_walker(selector=selector, iterations=iterations)
@@ -120,25 +359,39 @@ class Cell(BaseFeature):
         )
 
     def get_geometry(self) -> ShapelyPolygon:
-        ((shell, *holes),) = basic_int.h3_set_to_multi_polygon(
-            [self.index],
-            geo_json=True,
-        )
-        return ShapelyPolygon(shell=shell, holes=holes)
+        if self._geometry is None:
+            shell = memview_int.h3_to_geo_boundary(self.index, geo_json=True)
+            object.__setattr__(self, "_geometry", ShapelyPolygon(shell=shell))
+        return self._geometry
+
+    def get_geometry_mapping(self) -> Dict[str, Any]:
+        shell = memview_int.h3_to_geo_boundary(self.index, geo_json=True)
+        return {"type": "Polygon", "coordinates": (shell,)}
 
     def get_properties(self) -> Dict[str, Any]:
         return {"index": self.index}
 
 
 @dataclass(frozen=True)
-class Neighbor(BaseFeature):
+class Neighbor(_SlottedFeature):
+    __slots__ = ("cell", "position", "angle")
+
     cell: Cell
     position: int
     angle: float
 
-    def __post_init__(self):
-        assert 0 <= self.position <= 5, "invalid position"
-        assert 0 <= self.angle < 360, "invalid angle"
+    @classmethod
+    def validated(
+        cls: Type["Neighbor"],
+        cell: Cell,
+        position: int,
+        angle: float,
+    ) -> "Neighbor":
+        if not 0 <= position <= 5:
+            raise ValueError("invalid position")
+        if not 0 <= angle < 360:
+            raise ValueError("invalid angle")
+        return cls(cell=cell, position=position, angle=angle)
 
     def __eq__(self, other: "Neighbor") -> bool:
         if not isinstance(other, Neighbor):
@@ -151,6 +404,9 @@ class Neighbor(BaseFeature):
     def get_geometry(self) -> ShapelyPolygon:
         return self.cell.get_geometry()
 
+    def get_geometry_mapping(self) -> Dict[str, Any]:
+        return self.cell.get_geometry_mapping()
+
     def get_properties(self) -> Dict[str, Any]:
         return {
             **self.cell.get_properties(),
@@ -160,7 +416,9 @@ class Neighbor(BaseFeature):
 
 
 @dataclass(frozen=True)
-class GridCell(BaseFeature):
+class GridCell(_SlottedFeature):
+    __slots__ = ("cell", "key", "coordinates")
+
     cell: Cell
     key: int
     coordinates: Tuple[int, int]
@@ -168,6 +426,9 @@ class GridCell(BaseFeature):
     def get_geometry(self) -> ShapelyPolygon:
         return self.cell.get_geometry()
 
+    def get_geometry_mapping(self) -> Dict[str, Any]:
+        return self.cell.get_geometry_mapping()
+
     def get_properties(self) -> Dict[str, Any]:
         return {
             **self.cell.get_properties(),
@@ -176,11 +437,48 @@ class GridCell(BaseFeature):
         }
 
 
-class Grid(Mapping, BaseCollection):
-    _SHIFT_NEIGHBOR_J = {0: 1, 1: 0, 2: -1, 3: -1, 4: 0, 5: 1}
-    _SHIFT_NEIGHBOR_I_EVEN = {0: 0, 1: 1, 2: 0, 3: -1, 4: -1, 5: -1}
-    _SHIFT_NEIGHBOR_I_ODD = {0: 1, 1: 1, 2: 1, 3: 0, 4: -1, 5: 0}
+# neighbor coordinate shifts by position, with the i shift indexed by row parity
+_SHIFT_NEIGHBOR_J = (1, 0, -1, -1, 0, 1)
+_SHIFT_NEIGHBOR_I = ((0, 1, 0, -1, -1, -1), (1, 1, 1, 0, -1, 0))
+
+
+def _expand_grid_indexes(
+    init_index: H3IndexType,
+    width: int,
+    height: int,
+    bearing: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    # breadth-first traversal on raw integers, filling preallocated arrays
+    # of grid keys and H3 indexes so cells are only built once at the end
+    keys = np.empty(width * height, dtype=np.int64)
+    indexes = np.empty(width * height, dtype=np.uint64)
+    size = 0
+    queue = deque([(width // 2, height // 2, init_index)])
+    visited = {init_index}
+    while len(queue) > 0:
+        i, j, index = queue.pop()
+        if index in _PENTAGON_INDEXES:
+            raise ValueError("cannot build grid with pentagons")
+        if size == len(keys):
+            # distorted areas may map several cells to the same coordinates
+            keys, indexes = np.resize(keys, 2 * size), np.resize(indexes, 2 * size)
+        keys[size] = i + width * j
+        indexes[size] = index
+        size += 1
+        shift_i = _SHIFT_NEIGHBOR_I[j & 1]
+        for position, (_, neighbor, _, _) in enumerate(
+            _get_sorted_neighbors(index, bearing)
+        ):
+            if neighbor not in visited:
+                visited.add(neighbor)
+                neighbor_i = i + shift_i[position]
+                neighbor_j = j + _SHIFT_NEIGHBOR_J[position]
+                if 0 <= neighbor_i < width and 0 <= neighbor_j < height:
+                    queue.appendleft((neighbor_i, neighbor_j, neighbor))
+    return keys[:size], indexes[:size]
 
+
+class Grid(Mapping, BaseCollection):
     def __init__(self, height: int, width: int, bearing: float = 0.0) -> None:
         if not (height > 0 and width > 0):
             raise ValueError("map dimensions must be positive")
@@ -221,32 +519,50 @@ class Grid(Mapping, BaseCollection):
 
     def expand_from_cell(self, init_cell: Cell) -> "Grid":
         self._cell_map.clear()
-        init_cell_coordinates = self._width // 2, self._height // 2
-        queue = deque([(init_cell_coordinates, init_cell)])
-        visited = set([init_cell])
-        while len(queue) > 0:
-            coordinates, cell = queue.pop()
-            if cell.is_pentagon:
-                raise ValueError("cannot build grid with pentagons")
-            key = self.coordinates_to_key(coordinates)
-            self._cell_map[key] = GridCell(cell=cell, key=key, coordinates=coordinates)
-            for position, neighbor in cell.get_neighbor_map(self._bearing).items():
-                if neighbor.cell not in visited:
-                    visited.add(neighbor.cell)
-                    i, j = coordinates
-                    neighbor_i = i + (
-                        self._SHIFT_NEIGHBOR_I_EVEN[position]
-                        if j % 2 == 0
-                        else self._SHIFT_NEIGHBOR_I_ODD[position]
-                    )
-                    neighbor_j = j + self._SHIFT_NEIGHBOR_J[position]
-                    if 0 <= neighbor_i < self._width and 0 <= neighbor_j < self._height:
-                        queue.appendleft(((neighbor_i, neighbor_j), neighbor.cell))
+        keys, indexes = _expand_grid_indexes(
+            init_index=init_cell.index,
+            width=self._width,
+            height=self._height,
+            bearing=self._bearing,
+        )
+        for key, index in zip(keys.tolist(), indexes.tolist()):
+            self._cell_map[key] = GridCell(
+                cell=Cell(index=index),
+                key=key,
+                coordinates=self.key_to_coordinates(key),
+            )
         return self
 
     def expand_from_point(self, point: Point, resolution: int) -> "Grid":
         cell = Cell.from_point(point, resolution)
         return self.expand_from_cell(cell)
 
+    @classmethod
+    def from_arrays(
+        cls: Type["Grid"],
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        resolution: int,
+        height: int,
+        width: int,
+        bearing: float = 0.0,
+    ) -> List["Grid"]:
+        # one grid per point, all the points being indexed in a single batch
+        _validate_coordinate_arrays(latitudes, longitudes)
+        indexes = geo_to_indexes(latitudes, longitudes, resolution)
+        return [
+            cls(height=height, width=width, bearing=bearing).expand_from_cell(cell)
+            for cell in Cell.from_indexes(indexes)
+        ]
+
+    def get_multipolygon_geometry(self) -> ShapelyMultiPolygon:
+        polygons = basic_int.h3_set_to_multi_polygon(
+            [c.cell.index for c in self._cell_map.values()],
+            geo_json=True,
+        )
+        return ShapelyMultiPolygon(
+            [(shell, holes) for shell, *holes in polygons],
+        )
+
     def get_features(self) -> List[Dict[str, Any]]:
         return list(f.__geo_interface__ for f in self._cell_map.values())
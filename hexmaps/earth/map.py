@@ -4,6 +4,7 @@ from itertools import chain, islice
 from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Type, Union
 
 import folium
+import numpy as np
 from hexmaps.earth.spatial.geojson import GeoOrGeoSequence, get_feature_collection
 
 TILE_LAYER_COLLECTION = OrderedDict(
@@ -89,10 +90,8 @@ def _trim_properties(
     data: Dict[str, Any],
     field_names: Optional[Tuple[str]],
     field_count: Optional[int],
-) -> Tuple[str, ...]:
-    fields = OrderedDict()
-    if field_names is not None:
-        fields.update([(f, None) for f in field_names])
+) -> Tuple[Dict[str, Any], Tuple[str, ...]]:
+    fields = {} if field_names is None else dict.fromkeys(field_names)
     if field_count is not None:
         field_counter = _get_geojson_property_counter(data)
         fields.update(
@@ -101,9 +100,13 @@ def _trim_properties(
                 max(field_count - len(fields), 0),
             )
         )
-    for f in data["features"]:
-        f["properties"] = OrderedDict([(k, f["properties"].get(k)) for k in fields])
-    return tuple(fields)
+    # shallow copies of the collection and its features leave the caller's
+    # data untouched while sharing the (large) geometries
+    features = [
+        {**f, "properties": {k: f["properties"].get(k) for k in fields}}
+        for f in data["features"]
+    ]
+    return {**data, "features": features}, tuple(fields)
 
 
 def _build_geojson_details(
@@ -120,19 +123,20 @@ def _build_geojson_details(
 def _get_geojson_items_bounds(
     geojson_items: Iterable[folium.GeoJson],
 ) -> Optional[Tuple[Tuple[float, float], Tuple[float, float]]]:
-    lat_min, lon_min, lat_max, lon_max = None, None, None, None
+    bounds_list = []
     for g in geojson_items:
         try:
-            (new_lat_min, new_lon_min), (new_lat_max, new_lon_max) = g.get_bounds()
+            bounds = g.get_bounds()
         except KeyError:
             pass
         else:
-            if new_lat_min is not None:
-                lat_min = min(lat_min or new_lat_min, new_lat_min)
-                lon_min = min(lon_min or new_lon_min, new_lon_min)
-                lat_max = max(lat_max or new_lat_max, new_lat_max)
-                lon_max = max(lon_max or new_lon_max, new_lon_max)
-    if lat_min is not None:
+            if bounds[0][0] is not None:
+                bounds_list.append(bounds)
+    if len(bounds_list) > 0:
+        # shape (N, 2, 2): items, south-west/north-east corners, lat/lon
+        bounds_array = np.array(bounds_list, dtype=np.float64)
+        lat_min, lon_min = bounds_array[:, 0].min(axis=0).tolist()
+        lat_max, lon_max = bounds_array[:, 1].max(axis=0).tolist()
         return (lat_min, lon_min), (lat_max, lon_max)
 
 
@@ -198,9 +202,8 @@ class GeoJsonArguments:
 
 
 def build_geojson_item(args: GeoJsonArguments) -> folium.GeoJson:
-    data = get_feature_collection(args.geo)
-    field_names = _trim_properties(
-        data=data,
+    data, field_names = _trim_properties(
+        data=get_feature_collection(args.geo),
         field_names=args.detail_options.field_names,
         field_count=args.detail_options.field_count,
     )
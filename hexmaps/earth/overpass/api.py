@@ -1,13 +1,28 @@
 import itertools
 import json
-import math
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import nullcontext
 from dataclasses import dataclass
 from datetime import timedelta
 from decimal import Decimal
 from enum import Enum
-from typing import AnyStr, List, Optional, Set, Tuple
+from functools import lru_cache, partial
+from typing import (
+    AnyStr,
+    Callable,
+    FrozenSet,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
 
 import overpy
+from hexmaps.earth.slots import SlottedDataclass
 from hexmaps.earth.overpass.node import NodeFeature
 from hexmaps.earth.overpass.relation import RelationFeature
 from hexmaps.earth.overpass.way import WayFeature
@@ -15,10 +30,16 @@ from hexmaps.earth.overpass.way import WayFeature
 _DEFAULT_OVERPASS_MAXSIZE = 536870912
 _DEFAULT_OVERPASS_TIMEOUT = timedelta(seconds=180)
 _DEFAULT_OVERPASS_OUT = {"body", "geom"}
+# Overpass servers only accept a couple of concurrent requests per IP
+_MAX_OVERPASS_WORKERS = 2
 
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class BBox(SlottedDataclass):
+    __slots__ = ("west", "south", "east", "north")
 
-@dataclass
-class BBox:
     west: float
     south: float
     east: float
@@ -33,6 +54,7 @@ class Recurse(Enum):
     UP_RELATIONS = "<<;"
 
 
+@lru_cache(maxsize=128)
 def _build_settings(
     bbox: Optional[BBox],
     timeout: timedelta,
@@ -40,7 +62,7 @@ def _build_settings(
 ) -> str:
     query_parts = [
         "[out:json]",
-        f"[timeout:{math.floor(timeout.total_seconds())}]",
+        f"[timeout:{int(timeout.total_seconds())}]",
         f"[maxsize:{maxsize}]",
     ]
     if bbox:
@@ -49,6 +71,12 @@ def _build_settings(
     return "".join(query_parts)
 
 
+@lru_cache(maxsize=128)
+def _build_out_statement(out: FrozenSet[str]) -> str:
+    # sorted so that equal sets always produce the same query string
+    return f'out{" " * (len(out) > 0)}{" ".join(sorted(out))};'
+
+
 def build_union_query(
     union_block: str,
     out: Optional[Set[str]] = None,
@@ -63,21 +91,12 @@ def build_union_query(
         raise ValueError("argument is not a Union block statement")
     if out is None:
         out = _DEFAULT_OVERPASS_OUT
-    out_statement = f'out{" " * (len(out) > 0)}{" ".join(out)};'
+    out_statement = _build_out_statement(frozenset(out))
     # build query
-    query_parts = [
-        _build_settings(
-            bbox=bbox,
-            timeout=timeout,
-            maxsize=maxsize,
-        ),
-        union_block,
-    ]
-    if recurse != Recurse.NONE:
-        query_parts.append(f"(._; {recurse.value});")
-    query_parts.append(out_statement)
-    query = "\n".join(query_parts)
-    return query
+    settings = _build_settings(bbox=bbox, timeout=timeout, maxsize=maxsize)
+    if recurse is Recurse.NONE:
+        return f"{settings}\n{union_block}\n{out_statement}"
+    return f"{settings}\n{union_block}\n(._; {recurse.value});\n{out_statement}"
 
 
 class OverpassAPI(overpy.Overpass):
@@ -86,6 +105,7 @@ class OverpassAPI(overpy.Overpass):
     default_resolve_recurse = Recurse.DOWN
     default_resolve_timeout = timedelta(seconds=10)
     default_resolve_maxsize = _DEFAULT_OVERPASS_MAXSIZE
+    default_use_decimal = False
 
     def __init__(
         self,
@@ -94,6 +114,7 @@ class OverpassAPI(overpy.Overpass):
         resolve_recurse: Optional[Recurse] = None,
         resolve_timeout: Optional[timedelta] = None,
         resolve_maxsize: Optional[int] = None,
+        use_decimal: Optional[bool] = None,
         **kwargs,
     ):
         super().__init__(*args, **kwargs)
@@ -109,13 +130,21 @@ class OverpassAPI(overpy.Overpass):
         self.resolve_maxsize = (
             self.default_resolve_maxsize if resolve_maxsize is None else resolve_maxsize
         )
+        # floats are exact enough for the 7 decimal places of OSM coordinates,
+        # decimals are only worth their cost for exact serialization
+        self.use_decimal = (
+            self.default_use_decimal if use_decimal is None else use_decimal
+        )
 
     def parse_json(self, data: AnyStr, encoding: str = "utf-8") -> "OverpassResult":
         # FIXME: this code was copy pasted from overpy
         # and may be broken in case of a dependency update
         if isinstance(data, bytes):
             data = data.decode(encoding)
-        data = json.loads(data, parse_float=Decimal)
+        if self.use_decimal:
+            data = json.loads(data, parse_float=Decimal)
+        else:
+            data = json.loads(data)
         if "remark" in data:
             self._handle_remark_msg(msg=data.get("remark"))
         return OverpassResult.from_json(data, api=self)
@@ -125,6 +154,16 @@ class OverpassAPI(overpy.Overpass):
 
 
 class OverpassResult(overpy.Result):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # serializes the expansion of the result with the indexing of its
+        # elements, both may happen from several threads of get_features
+        self.lock = threading.RLock()
+
+    def expand(self, other: overpy.Result) -> None:
+        with self.lock:
+            super().expand(other)
+
     def _build_resolve_query(self, element_type: str, element_id: int) -> str:
         api: OverpassAPI = self.api
         return build_union_query(
@@ -136,6 +175,36 @@ class OverpassResult(overpy.Result):
             maxsize=api.resolve_maxsize,
         )
 
+    def prefetch(
+        self,
+        node_ids: Iterable[int] = (),
+        way_ids: Iterable[int] = (),
+        relation_ids: Iterable[int] = (),
+    ) -> None:
+        # resolve many missing elements with a single query instead of one
+        # query per element
+        statements = []
+        for element_type, collection, ids in (
+            ("node", self._nodes, node_ids),
+            ("way", self._ways, way_ids),
+            ("rel", self._relations, relation_ids),
+        ):
+            missing = sorted({i for i in ids if i not in collection})
+            if len(missing) > 0:
+                statements.append(f"{element_type}(id:{','.join(map(str, missing))});")
+        if len(statements) == 0:
+            return
+        api: OverpassAPI = self.api
+        query = build_union_query(
+            union_block=f"({' '.join(statements)});",
+            out=api.resolve_out,
+            bbox=None,
+            recurse=api.resolve_recurse,
+            timeout=api.resolve_timeout,
+            maxsize=api.resolve_maxsize,
+        )
+        self.expand(api.query(query))
+
     def get_area(self, area_id: int, resolve_missing: bool = False):
         # FIXME: this code was copy pasted from overpy
         # and may be broken in case of a dependency update
@@ -205,63 +274,88 @@ class OverpassResult(overpy.Result):
         return relations[0]
 
 
-def get_elements(
-    result: overpy.Result,
-) -> Tuple[List[overpy.Node], List[overpy.Way], List[overpy.Relation]]:
-    return (
-        result.get_nodes(),
-        result.get_ways(),
-        result.get_relations(),
+class Elements(NamedTuple):
+    nodes: List[overpy.Node]
+    ways: List[overpy.Way]
+    relations: List[overpy.Relation]
+
+
+def get_elements(result: overpy.Result) -> Elements:
+    return Elements(
+        nodes=result.get_nodes(),
+        ways=result.get_ways(),
+        relations=result.get_relations(),
     )
 
 
+FeaturesType = Tuple[List[NodeFeature], List[WayFeature], List[RelationFeature]]
+
+
+def get_element_counts(result: overpy.Result) -> Tuple[int, int, int]:
+    # counting does not need the element lists built by get_elements
+    return len(result._nodes), len(result._ways), len(result._relations)
+
+
+def _map_elements(
+    func: Callable[[overpy.Element], T],
+    elements: Iterable[overpy.Element],
+    executor: Optional[Executor] = None,
+) -> List[T]:
+    if executor is None:
+        return [func(e) for e in elements]
+    return list(executor.map(func, elements))
+
+
 def get_features(
-    elements: Tuple[List[overpy.Node], List[overpy.Way], List[overpy.Relation]],
+    elements: Elements,
     resolve_missing: bool = False,
     split_relations: bool = False,
     repolygonize: bool = True,
     allow_dangles: bool = True,
     allow_invalids: bool = True,
-) -> Tuple[List[NodeFeature], List[WayFeature], List[RelationFeature]]:
+    max_workers: Optional[int] = None,
+) -> FeaturesType:
     nodes, ways, relations = elements
-    node_features = [
-        NodeFeature.from_element(
-            element=n,
-            resolve_missing=resolve_missing,
-        )
-        for n in nodes
-    ]
-    way_features = [
-        WayFeature.from_element(
-            element=w,
-            resolve_missing=resolve_missing,
-            allow_dangles=allow_dangles,
-            allow_invalids=allow_invalids,
-        )
-        for w in ways
-    ]
-    if split_relations:
-        relation_features = list(
-            itertools.chain.from_iterable(
-                RelationFeature.split_element(
-                    element=r,
-                    resolve_missing=resolve_missing,
-                    repolygonize=repolygonize,
-                    allow_dangles=allow_dangles,
-                    allow_invalids=allow_invalids,
-                )
-                for r in relations
+    # elements are built serially unless more workers are asked for: resolving
+    # missing elements blocks on HTTP requests, which do not hold the GIL,
+    # whereas building geometries alone is CPU bound
+    threaded = resolve_missing and max_workers is not None and max_workers > 1
+    with (
+        ThreadPoolExecutor(max_workers=min(max_workers, _MAX_OVERPASS_WORKERS))
+        if threaded
+        else nullcontext()
+    ) as executor:
+        if resolve_missing:
+            node_features = _map_elements(
+                partial(NodeFeature.from_element, resolve_missing=resolve_missing),
+                nodes,
+                executor=executor,
             )
+        else:
+            node_features = NodeFeature.from_elements(nodes)
+        way_features = _map_elements(
+            partial(
+                WayFeature.from_element,
+                resolve_missing=resolve_missing,
+                allow_dangles=allow_dangles,
+                allow_invalids=allow_invalids,
+            ),
+            ways,
+            executor=executor,
         )
-    else:
-        relation_features = [
-            RelationFeature.from_element(
-                element=r,
+        relation_features = _map_elements(
+            partial(
+                RelationFeature.split_element
+                if split_relations
+                else RelationFeature.from_element,
                 resolve_missing=resolve_missing,
                 repolygonize=repolygonize,
                 allow_dangles=allow_dangles,
                 allow_invalids=allow_invalids,
-            )
-            for r in relations
-        ]
+            ),
+            relations,
+            executor=executor,
+        )
+    if split_relations:
+        relation_features = list(itertools.chain.from_iterable(relation_features))
     return node_features, way_features, relation_features
@@ -1,9 +1,13 @@
 from abc import abstractmethod
 from enum import Enum
-from typing import Any, Dict
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping
+from weakref import WeakKeyDictionary
 
 import overpy
 from hexmaps.earth.spatial.geojson import BaseFeature
+from shapely.geometry import mapping
 from shapely.geometry.base import BaseGeometry
 
 
@@ -14,9 +18,28 @@ class OverpassFeatureType(str, Enum):
 
 
 class OverpassFeature(BaseFeature):
+    # geometries are memoized per element object (not per OSM id, since two
+    # results may hold different data for the same id) and per build options
+    memoize_geometries = True
+    _geometry_cache: WeakKeyDictionary = WeakKeyDictionary()
+
     def __init__(self, element: overpy.Element, geometry: BaseGeometry) -> None:
         element = self._validate_element(element)
         geometry = self._validate_geometry(geometry)
+        self._assign(element=element, geometry=geometry)
+
+    @classmethod
+    def _from_trusted(
+        cls,
+        element: overpy.Element,
+        geometry: BaseGeometry,
+    ) -> "OverpassFeature":
+        # skips validation, for elements and geometries built by this package
+        feature = cls.__new__(cls)
+        feature._assign(element=element, geometry=geometry)
+        return feature
+
+    def _assign(self, element: overpy.Element, geometry: BaseGeometry) -> None:
         self._id = element.id
         self._type = OverpassFeatureType(type(element).__name__)
         self._tags = element.tags
@@ -31,13 +54,15 @@ class OverpassFeature(BaseFeature):
     def type(self) -> OverpassFeatureType:
         return self._type
 
+    # read-only views, so that reading them never copies the dicts; the views
+    # are built on access since mapping proxies cannot be pickled
     @property
-    def tags(self) -> Dict[str, Any]:
-        return self._tags.copy()
+    def tags(self) -> Mapping[str, Any]:
+        return MappingProxyType(self._tags)
 
     @property
-    def attributes(self) -> Dict[str, Any]:
-        return self._attributes.copy()
+    def attributes(self) -> Mapping[str, Any]:
+        return MappingProxyType(self._attributes)
 
     @property
     def geometry(self):
@@ -53,13 +78,39 @@ class OverpassFeature(BaseFeature):
             **self._tags,
         }
 
+    @cached_property
+    def _geometry_mapping(self) -> Dict[str, Any]:
+        # features are immutable, so their geometry is only mapped once
+        return mapping(self._geometry)
+
+    def get_geometry_mapping(self) -> Dict[str, Any]:
+        # callers get their own dict, the cached mapping is never handed out
+        return dict(self._geometry_mapping)
+
+    @classmethod
+    def _get_geometry(
+        cls,
+        element: overpy.Element,
+        build: Callable[..., BaseGeometry],
+        **kwargs,
+    ) -> BaseGeometry:
+        if not cls.memoize_geometries:
+            return build(element=element, **kwargs)
+        key = (build, tuple(kwargs.items()))
+        geometries = cls._geometry_cache.setdefault(element, {})
+        try:
+            return geometries[key]
+        except KeyError:
+            geometry = geometries[key] = build(element=element, **kwargs)
+            return geometry
+
+    # validators of the public constructor, from_element implementations
+    # check their element inline and build trusted features
     @classmethod
-    @abstractmethod
     def _validate_element(cls, element: overpy.Element) -> overpy.Element:
         return element
 
     @classmethod
-    @abstractmethod
     def _validate_geometry(cls, geometry: BaseGeometry) -> BaseGeometry:
         return geometry
 
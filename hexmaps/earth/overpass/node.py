@@ -1,13 +1,23 @@
-from typing import Tuple, Union
+from contextlib import nullcontext
+from itertools import islice
+from typing import ContextManager, Dict, List, Sequence, Tuple, Union
+from weakref import WeakKeyDictionary
 
+import numpy as np
 import overpy
 from hexmaps.earth.overpass.base import OverpassFeature
-from hexmaps.earth.spatial.geometry import validate_wgs84_coordinates
+from hexmaps.earth.spatial.geometry import (
+    validate_wgs84_coordinate_array,
+    validate_wgs84_coordinates,
+)
 from shapely.geometry import Point
 
 NodeCoordinatesType = Tuple[float, float]
 NodeGeometryType = Point
 
+_NodeCoordinateIndexType = Tuple[np.ndarray, Dict[int, int]]
+_node_coordinate_indexes: WeakKeyDictionary = WeakKeyDictionary()
+
 
 def get_node_coordinates(
     element: Union[overpy.Node, overpy.RelationNode],
@@ -24,6 +34,52 @@ def get_node_coordinates(
     return validate_wgs84_coordinates(element.lon, element.lat)
 
 
+def _get_result_lock(result: overpy.Result) -> ContextManager:
+    # overpass results guard their expansion with a lock, plain overpy
+    # results are never expanded concurrently by this package
+    lock = getattr(result, "lock", None)
+    return nullcontext() if lock is None else lock
+
+
+def _get_node_coordinate_index(result: overpy.Result) -> _NodeCoordinateIndexType:
+    # overpy results only ever grow and expand appends the new nodes, so the
+    # index is extended with the rows of the nodes added since the last call
+    # instead of being rebuilt each time a missing node is resolved
+    with _get_result_lock(result):
+        nodes = result._nodes
+        try:
+            buffer, index = _node_coordinate_indexes[result]
+        except KeyError:
+            buffer, index = np.empty((0, 2), dtype=np.float64), {}
+        size, new_size = len(index), len(nodes)
+        if new_size > size:
+            # the added nodes are read from the end, without walking the others
+            added = list(islice(reversed(nodes.values()), new_size - size))
+            added.reverse()
+            if new_size > len(buffer):
+                # capacity doubles so that growing one node at a time stays linear
+                grown = np.empty((max(new_size, 2 * len(buffer)), 2), dtype=np.float64)
+                grown[:size] = buffer[:size]
+                buffer = grown
+            buffer[size:new_size] = np.array(
+                [(n.lon, n.lat) for n in added],
+                dtype=np.float64,
+            ).reshape(-1, 2)
+            index.update((n.id, row) for row, n in enumerate(added, size))
+            _node_coordinate_indexes[result] = buffer, index
+        return buffer[:new_size], index
+
+
+def get_node_coordinate_array(
+    result: overpy.Result,
+    node_ids: Sequence[int],
+) -> np.ndarray:
+    # raises KeyError when a node is missing from the result
+    coords, index = _get_node_coordinate_index(result)
+    rows = [index[node_id] for node_id in node_ids]
+    return validate_wgs84_coordinate_array(coords[rows])
+
+
 def build_node_geometry(
     element: Union[overpy.Node, overpy.RelationNode],
     resolve_missing: bool = False,
@@ -51,5 +107,40 @@ class NodeFeature(OverpassFeature):
         element: overpy.Element,
         resolve_missing: bool = False,
     ) -> "NodeFeature":
-        geometry = build_node_geometry(element=element, resolve_missing=resolve_missing)
-        return cls(element=element, geometry=geometry)
+        if not isinstance(element, overpy.Node):
+            raise ValueError("element must be a node")
+        geometry = cls._get_geometry(
+            element=element,
+            build=build_node_geometry,
+            resolve_missing=resolve_missing,
+        )
+        return cls._from_trusted(element=element, geometry=geometry)
+
+    @classmethod
+    def from_elements(cls, elements: Sequence[overpy.Node]) -> List["NodeFeature"]:
+        # bulk counterpart of from_element for nodes that carry their own
+        # coordinates: validation runs once over the whole coordinate array
+        if not all(isinstance(n, overpy.Node) for n in elements):
+            raise ValueError("element must be a node")
+        coords = np.array(
+            [(n.lon, n.lat) for n in elements],
+            dtype=np.float64,
+        ).reshape(-1, 2)
+        validate_wgs84_coordinate_array(coords)
+        return [
+            cls._from_trusted(element=n, geometry=Point(lon, lat))
+            for n, (lon, lat) in zip(elements, coords.tolist())
+        ]
+
+    @classmethod
+    def from_result(cls, result: overpy.Result) -> List["NodeFeature"]:
+        # all the nodes of the result, read from its shared coordinate index
+        # the nodes are read with their coordinates so that both stay aligned
+        with _get_result_lock(result):
+            coords, _ = _get_node_coordinate_index(result)
+            nodes = list(result._nodes.values())
+        validate_wgs84_coordinate_array(coords)
+        return [
+            cls._from_trusted(element=n, geometry=Point(lon, lat))
+            for n, (lon, lat) in zip(nodes, coords.tolist())
+        ]
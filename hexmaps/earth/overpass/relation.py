@@ -1,10 +1,10 @@
-from collections import OrderedDict, deque
-from typing import Dict, List, Tuple, Union, get_args
+from collections import deque
+from typing import Dict, Iterator, List, Tuple, Union, get_args
 
 import overpy
 from hexmaps.earth.overpass import node, way
 from hexmaps.earth.overpass.base import OverpassFeature
-from hexmaps.earth.spatial.geometry import polygonize
+from hexmaps.earth.spatial.geometry import orient, polygonize
 from shapely.geometry import (
     GeometryCollection,
     LineString,
@@ -14,7 +14,6 @@ from shapely.geometry import (
     Point,
     Polygon,
 )
-from shapely.geometry.polygon import orient
 
 RelationCoordinatesType = Tuple[
     Tuple[node.NodeCoordinatesType, ...],
@@ -30,47 +29,107 @@ RelationGeometryType = Union[
     LineString,
     Point,
 ]
+_RELATION_GEOMETRY_TYPES = get_args(RelationGeometryType)
+
+# relation members are dispatched on their exact type
+_MEMBER_TYPES = (overpy.RelationNode, overpy.RelationWay, overpy.RelationRelation)
+
+
+def _prefetch_members(
+    result: overpy.Result,
+    members: Dict[type, List[overpy.RelationMember]],
+) -> None:
+    # overpass results can fetch all the members that would otherwise be
+    # resolved one by one in a single query, plain overpy results cannot
+    prefetch = getattr(result, "prefetch", None)
+    if prefetch is None:
+        return
+    prefetch(
+        node_ids=(
+            n.ref
+            for n in members[overpy.RelationNode]
+            if n.attributes.get("lon") is None or n.attributes.get("lat") is None
+        ),
+        way_ids=(w.ref for w in members[overpy.RelationWay] if w.geometry is None),
+        relation_ids=(r.ref for r in members[overpy.RelationRelation]),
+    )
 
 
 class RecursedRelation:
+    nodes: Tuple[overpy.RelationNode, ...]
+    ways: Tuple[overpy.RelationWay, ...]
+    relations: Tuple["RecursedRelation", ...]
+
     def __init__(
         self,
         element: Union[overpy.Relation, overpy.RelationRelation],
         resolve_missing: bool = False,
     ) -> None:
-        if isinstance(element, overpy.RelationRelation):
-            element = element.resolve(resolve_missing=resolve_missing)
-        node_list, way_list, relation_list = [], [], []
-        for m in element.members:
-            if isinstance(m, overpy.RelationNode):
-                node_list.append(m)
-            elif isinstance(m, overpy.RelationWay):
-                way_list.append(m)
-            elif isinstance(m, overpy.RelationRelation):
-                relation_list.append(
-                    type(self)(element=m, resolve_missing=resolve_missing)
-                )
-            else:
-                raise ValueError(f"unsupported relation type '{type(m).__name__}'")
-        self._resolve_missing = resolve_missing
-        self.nodes: Tuple[overpy.RelationNode] = tuple(node_list)
-        self.ways: Tuple[overpy.RelationWay] = tuple(way_list)
-        self.relations: Tuple["RecursedRelation"] = tuple(relation_list)
+        # the tree is expanded depth first from an explicit stack, children
+        # being allocated empty and filled in when they are popped
+        cls = type(self)
+        stack = [(self, element, frozenset())]
+        while len(stack) > 0:
+            rel, element, ancestor_ids = stack.pop()
+            if isinstance(element, overpy.RelationRelation):
+                element = element.resolve(resolve_missing=resolve_missing)
+            if element.id in ancestor_ids:
+                raise ValueError(f"relation {element.id} contains itself")
+            members = {t: [] for t in _MEMBER_TYPES}
+            for m in element.members:
+                try:
+                    members[type(m)].append(m)
+                except KeyError:
+                    error = f"unsupported relation type '{type(m).__name__}'"
+                    raise ValueError(error) from None
+            rel_members = members[overpy.RelationRelation]
+            if resolve_missing:
+                _prefetch_members(element._result, members)
+            rel._resolve_missing = resolve_missing
+            rel.nodes = tuple(members[overpy.RelationNode])
+            rel.ways = tuple(members[overpy.RelationWay])
+            rel.relations = tuple([cls.__new__(cls) for _ in rel_members])
+            ancestor_ids = ancestor_ids | {element.id}
+            stack.extend(
+                (child, m, ancestor_ids)
+                for child, m in zip(reversed(rel.relations), reversed(rel_members))
+            )
 
     def get_coordinates(self) -> RelationCoordinatesType:
-        nodes = tuple(
-            node.get_node_coordinates(element=n, resolve_missing=self._resolve_missing)
-            for n in self.nodes
-        )
-        ways = tuple(
-            way.get_way_coordinates(element=w, resolve_missing=self._resolve_missing)
-            for w in self.ways
-        )
-        relations = tuple(
-            r.get_coordinates(resolve_missing=self._resolve_missing)
-            for r in self.relations
-        )
-        return nodes, ways, relations
+        coordinates = {}
+        # ways shared by several relations of the tree are only decoded once
+        way_coordinates: Dict[int, way.WayCoordinatesType] = {}
+        for rel in self._iter_relations():
+            nodes = tuple(
+                [
+                    node.get_node_coordinates(
+                        element=n, resolve_missing=rel._resolve_missing
+                    )
+                    for n in rel.nodes
+                ]
+            )
+            for w in rel.ways:
+                if w.ref not in way_coordinates:
+                    way_coordinates[w.ref] = way.get_way_coordinates(
+                        element=w,
+                        resolve_missing=rel._resolve_missing,
+                    )
+            ways = tuple([way_coordinates[w.ref] for w in rel.ways])
+            relations = tuple([coordinates.pop(id(r)) for r in rel.relations])
+            coordinates[id(rel)] = nodes, ways, relations
+        return coordinates[id(self)]
+
+    def _iter_relations(self) -> Iterator["RecursedRelation"]:
+        # post-order walk of the relation tree (children before their parent)
+        # with an explicit stack instead of one Python frame per nesting level
+        stack = [(self, False)]
+        while len(stack) > 0:
+            rel, children_done = stack.pop()
+            if children_done:
+                yield rel
+            else:
+                stack.append((rel, True))
+                stack.extend((child, False) for child in reversed(rel.relations))
 
     def _recurse_geometries(
         self,
@@ -78,31 +137,31 @@ class RecursedRelation:
         allow_invalids: bool,
     ) -> Tuple[List[Point], List[LineString], List[Polygon]]:
         point_list, line_list, polygon_list = [], [], []
-        # get children geometries
-        for rel in self.relations:
-            pt, ln, pg = rel._recurse_geometries(
+        # ways shared by several relations of the tree are only built once,
+        # the lines being immutable they can be polygonized more than once
+        way_lines: Dict[int, LineString] = {}
+        for rel in self._iter_relations():
+            point_list.extend(
+                node.build_node_geometry(
+                    element=n, resolve_missing=rel._resolve_missing
+                )
+                for n in rel.nodes
+            )
+            for w in rel.ways:
+                if w.ref not in way_lines:
+                    way_lines[w.ref] = way.build_way_line(
+                        element=w,
+                        resolve_missing=rel._resolve_missing,
+                    )
+            # raw lines are polygonized together, building each way geometry
+            # first would only run an extra polygonize per closed way
+            pg, ln = polygonize(
+                lines=[way_lines[w.ref] for w in rel.ways],
                 allow_dangles=allow_dangles,
                 allow_invalids=allow_invalids,
             )
-            point_list.extend(pt)
             line_list.extend(ln)
             polygon_list.extend(pg)
-        # build own geometries
-        point_list.extend(
-            node.build_node_geometry(element=n, resolve_missing=self._resolve_missing)
-            for n in self.nodes
-        )
-        pg, ln = polygonize(
-            lines=(
-                way.build_way_geometry(element=w, resolve_missing=self._resolve_missing)
-                for w in self.ways
-            ),
-            allow_dangles=allow_dangles,
-            allow_invalids=allow_invalids,
-        )
-        line_list.extend(ln)
-        polygon_list.extend(pg)
-        # return final lists
         return point_list, line_list, polygon_list
 
     def get_geometry(
@@ -143,7 +202,7 @@ class RecursedRelation:
     ) -> Dict[int, Tuple["RecursedRelation", Tuple[int, ...]]]:
         current_index = 0
         queue = deque([(current_index, self)])
-        tree = OrderedDict()
+        tree: Dict[int, Tuple["RecursedRelation", Tuple[int, ...]]] = {}
         while len(queue) > 0:
             rel_index, rel = queue.pop()
             rel_children_indexes = []
@@ -153,7 +212,8 @@ class RecursedRelation:
                 queue.appendleft((current_index, child))
             tree[rel_index] = rel, tuple(rel_children_indexes)
         if reverse:
-            tree = OrderedDict(sorted(tree.items(), reverse=reverse))
+            # indexes are inserted in increasing order, no need to sort them
+            tree = dict(reversed(tree.items()))
         return tree
 
 
@@ -195,7 +255,7 @@ class RelationFeature(OverpassFeature):
 
     @classmethod
     def _validate_geometry(cls, geometry: RelationGeometryType) -> RelationGeometryType:
-        if not isinstance(geometry, get_args(RelationGeometryType)):
+        if not isinstance(geometry, _RELATION_GEOMETRY_TYPES):
             raise ValueError("invalid geometry type")
         return geometry
 
@@ -208,14 +268,17 @@ class RelationFeature(OverpassFeature):
         allow_dangles: bool = True,
         allow_invalids: bool = True,
     ) -> "RelationFeature":
-        geometry = build_relation_geometry(
+        if not isinstance(element, overpy.Relation):
+            raise ValueError("element must be a relation")
+        geometry = cls._get_geometry(
             element=element,
+            build=build_relation_geometry,
             resolve_missing=resolve_missing,
             repolygonize=repolygonize,
             allow_dangles=allow_dangles,
             allow_invalids=allow_invalids,
         )
-        return cls(element=element, geometry=geometry)
+        return cls._from_trusted(element=element, geometry=geometry)
 
     @classmethod
     def split_element(
@@ -226,13 +289,18 @@ class RelationFeature(OverpassFeature):
         allow_dangles: bool = True,
         allow_invalids: bool = True,
     ) -> Tuple["RelationFeature", ...]:
-        geometry = build_relation_geometry(
+        if not isinstance(element, overpy.Relation):
+            raise ValueError("element must be a relation")
+        geometry = cls._get_geometry(
             element=element,
+            build=build_relation_geometry,
             resolve_missing=resolve_missing,
             repolygonize=repolygonize,
             allow_dangles=allow_dangles,
             allow_invalids=allow_invalids,
         )
         if not isinstance(geometry, GeometryCollection):
-            return (cls(element=element, geometry=geometry),)
-        return tuple(cls(element=element, geometry=g) for g in geometry.geoms)
+            return (cls._from_trusted(element=element, geometry=geometry),)
+        return tuple(
+            [cls._from_trusted(element=element, geometry=g) for g in geometry.geoms]
+        )
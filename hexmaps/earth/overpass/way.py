@@ -1,15 +1,29 @@
-from typing import Tuple, Union, get_args
+from itertools import chain
+from typing import Any, Iterable, Tuple, Union, get_args
 
+import numpy as np
 import overpy
 from hexmaps.earth.overpass import node
 from hexmaps.earth.overpass.base import OverpassFeature
-from hexmaps.earth.spatial.geometry import polygonize as polygonize
-from hexmaps.earth.spatial.geometry import validate_wgs84_coordinates
+from hexmaps.earth.spatial.geometry import orient, polygonize
+from hexmaps.earth.spatial.geometry import validate_wgs84_coordinate_array
 from shapely.geometry import LineString, Polygon
-from shapely.geometry.polygon import orient
 
-WayCoordinatesType = Tuple[node.NodeCoordinatesType, ...]
+# (N, 2) float64 array of (lon, lat) rows
+WayCoordinatesType = np.ndarray
 WayGeometryType = Union[LineString, Polygon]
+_WAY_GEOMETRY_TYPES = get_args(WayGeometryType)
+
+
+def _build_coordinate_array(
+    coordinates: Iterable[Tuple[Any, Any]],
+    length: int = -1,
+) -> np.ndarray:
+    # with a known length the buffer is allocated once instead of growing
+    flat = chain.from_iterable(coordinates)
+    count = 2 * length if length >= 0 else -1
+    coords = np.fromiter(flat, dtype=np.float64, count=count).reshape(-1, 2)
+    return validate_wgs84_coordinate_array(coords)
 
 
 def get_way_coordinates(
@@ -18,37 +32,65 @@ def get_way_coordinates(
 ) -> WayCoordinatesType:
     if isinstance(element, overpy.RelationWay):
         try:
-            return tuple(
-                validate_wgs84_coordinates(g.lon, g.lat) for g in element.geometry
+            geometry = element.geometry
+            return _build_coordinate_array(
+                ((g.lon, g.lat) for g in geometry), length=len(geometry)
             )
         except (TypeError, ValueError):
             # element.geometry is None or invalid coordinates
             element: overpy.Way = element.resolve(resolve_missing=resolve_missing)
     try:
-        return tuple(
-            validate_wgs84_coordinates(g["lon"], g["lat"])
-            for g in element.attributes.get("geometry")
+        geometry = element.attributes.get("geometry")
+        return _build_coordinate_array(
+            ((g["lon"], g["lat"]) for g in geometry), length=len(geometry)
         )
     except (TypeError, ValueError):
         # element.attributes.get("geometry") is None or invalid coordinates
-        return tuple(
-            node.get_node_coordinates(element=n, resolve_missing=resolve_missing)
-            for n in element.get_nodes(resolve_missing=resolve_missing)
+        pass
+    try:
+        return node.get_node_coordinate_array(element._result, element._node_ids)
+    except KeyError:
+        # some nodes are missing from the result and may have to be resolved
+        nodes = element.get_nodes(resolve_missing=resolve_missing)
+        return _build_coordinate_array(
+            (
+                node.get_node_coordinates(element=n, resolve_missing=resolve_missing)
+                for n in nodes
+            ),
+            length=len(nodes),
         )
 
 
-def build_way_geometry(
+def build_way_line(
     element: Union[overpy.Way, overpy.RelationWay],
     resolve_missing: bool = False,
-    allow_dangles: bool = True,
-    allow_invalids: bool = True,
-) -> WayGeometryType:
-    line = LineString(
+) -> LineString:
+    return LineString(
         get_way_coordinates(
             element=element,
             resolve_missing=resolve_missing,
         )
     )
+
+
+def build_way_geometry(
+    element: Union[overpy.Way, overpy.RelationWay],
+    resolve_missing: bool = False,
+    allow_dangles: bool = True,
+    allow_invalids: bool = True,
+) -> WayGeometryType:
+    coords = get_way_coordinates(
+        element=element,
+        resolve_missing=resolve_missing,
+    )
+    line = LineString(coords)
+    if (coords[0] != coords[-1]).any():
+        # polygonize would return an open way unchanged as a single cut line,
+        # degenerate closed ways still go through its validation below
+        return line
+    if line.is_ring:
+        # a simple closed way is the only ring of its own polygon
+        return orient(Polygon(coords))
     polygon_tuple, line_tuple = polygonize(
         lines=[line],
         allow_dangles=allow_dangles,
@@ -71,7 +113,7 @@ class WayFeature(OverpassFeature):
 
     @classmethod
     def _validate_geometry(cls, geometry: WayGeometryType) -> WayGeometryType:
-        if not isinstance(geometry, get_args(WayGeometryType)):
+        if not isinstance(geometry, _WAY_GEOMETRY_TYPES):
             raise ValueError("invalid geometry type")
         return geometry
 
@@ -83,10 +125,13 @@ class WayFeature(OverpassFeature):
         allow_dangles: bool = True,
         allow_invalids: bool = True,
     ) -> "WayFeature":
-        geometry = build_way_geometry(
+        if not isinstance(element, overpy.Way):
+            raise ValueError("element must be a way")
+        geometry = cls._get_geometry(
             element=element,
+            build=build_way_geometry,
             resolve_missing=resolve_missing,
             allow_dangles=allow_dangles,
             allow_invalids=allow_invalids,
         )
-        return cls(element=element, geometry=geometry)
+        return cls._from_trusted(element=element, geometry=geometry)
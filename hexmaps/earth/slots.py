@@ -0,0 +1,12 @@
+from dataclasses import fields
+from typing import Any, Tuple, Type
+
+
+class SlottedDataclass:
+    # dataclasses only generate __slots__ from Python 3.10, so subclasses
+    # declare them by hand; frozen slotted instances cannot restore their
+    # state through setattr when unpickled, so rebuild them from their fields
+    __slots__ = ()
+
+    def __reduce__(self) -> Tuple[Type["SlottedDataclass"], Tuple[Any, ...]]:
+        return type(self), tuple(getattr(self, f.name) for f in fields(self))
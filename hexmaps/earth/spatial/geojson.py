@@ -1,12 +1,15 @@
+import json
 from abc import ABC, abstractmethod
 from collections.abc import Sequence as ABCSequence
-from typing import Any, Dict, List, Optional, Sequence, Union
+from typing import Any, Dict, Iterator, List, Optional, Sequence, TextIO, Union
 
 from shapely.geometry import mapping
 from shapely.geometry.base import BaseGeometry
 
 
 class GeoInterface(ABC):
+    __slots__ = ()
+
     @property
     @abstractmethod
     def __geo_interface__(self) -> Dict[str, Any]:
@@ -14,6 +17,8 @@ class GeoInterface(ABC):
 
 
 class BaseFeature(GeoInterface):
+    __slots__ = ()
+
     @abstractmethod
     def get_geometry(self) -> BaseGeometry:
         pass
@@ -22,16 +27,21 @@ class BaseFeature(GeoInterface):
     def get_properties(self) -> Dict[str, Any]:
         pass
 
+    def get_geometry_mapping(self) -> Dict[str, Any]:
+        return mapping(self.get_geometry())
+
     @property
     def __geo_interface__(self) -> Dict[str, Any]:
         return {
             "type": "Feature",
-            "geometry": mapping(self.get_geometry()),
+            "geometry": self.get_geometry_mapping(),
             "properties": self.get_properties(),
         }
 
 
 class BaseCollection(GeoInterface):
+    __slots__ = ()
+
     @abstractmethod
     def get_features(self) -> List[Dict[str, Any]]:
         pass
@@ -70,11 +80,17 @@ def validate_feature_data(data: Dict[str, Any]) -> Dict[str, Any]:
     return data
 
 
-def validate_collection_data(data: Dict[str, Any]) -> Dict[str, Any]:
+def _validate_collection_header(data: Dict[str, Any]) -> Dict[str, Any]:
+    # checks the collection itself, leaving its features to the caller
     if data.get("type") != "FeatureCollection":
         raise ValueError("type must be 'FeatureCollection'")
     if "features" not in data:
         raise ValueError("missing features")
+    return data
+
+
+def validate_collection_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    _validate_collection_header(data)
     for f in data["features"]:
         validate_feature_data(f)
     return data
@@ -99,9 +115,16 @@ def get_geojson_data(geo: GeoInterface) -> Dict[str, Any]:
 GeoOrGeoSequence = Union[GeoInterface, Sequence[GeoInterface]]
 
 
+def _get_feature_data(geo: GeoInterface) -> Dict[str, Any]:
+    # BaseFeature always builds a well-formed feature, only validate others
+    if isinstance(geo, BaseFeature):
+        return geo.__geo_interface__
+    return validate_feature_data(geo.__geo_interface__)
+
+
 def get_feature_collection(geo: GeoOrGeoSequence) -> Dict[str, Any]:
     if isinstance(geo, ABCSequence):
-        features = [validate_feature_data(g.__geo_interface__) for g in geo]
+        features = [_get_feature_data(g) for g in geo]
         return {
             "type": "FeatureCollection",
             "features": features,
@@ -113,3 +136,26 @@ def get_feature_collection(geo: GeoOrGeoSequence) -> Dict[str, Any]:
             "features": [validate_feature_data(data)],
         }
     return validate_collection_data(data)
+
+
+def iter_features(geo: GeoOrGeoSequence) -> Iterator[Dict[str, Any]]:
+    if isinstance(geo, ABCSequence):
+        for g in geo:
+            yield _get_feature_data(g)
+        return
+    data = geo.__geo_interface__
+    if data.get("type") == "Feature":
+        yield validate_feature_data(data)
+        return
+    for f in _validate_collection_header(data)["features"]:
+        yield validate_feature_data(f)
+
+
+def write_feature_collection(geo: GeoOrGeoSequence, fp: TextIO, **kwargs) -> None:
+    # features are serialized one at a time instead of as a whole collection
+    fp.write('{"type": "FeatureCollection", "features": [')
+    for i, f in enumerate(iter_features(geo)):
+        if i > 0:
+            fp.write(", ")
+        json.dump(f, fp, **kwargs)
+    fp.write("]}")
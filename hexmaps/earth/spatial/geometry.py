@@ -1,6 +1,7 @@
 from typing import Iterable, Iterator, List, Tuple, Type, Union
 
-from shapely.geometry import LineString, MultiLineString, Polygon
+import numpy as np
+from shapely.geometry import LinearRing, LineString, MultiLineString, Polygon
 from shapely.geometry.base import BaseGeometry, BaseMultipartGeometry
 from shapely.ops import polygonize_full
 
@@ -28,6 +29,20 @@ def extract_geometry_type(
             raise ValueError(error)
 
 
+def _get_parts(
+    collection: BaseMultipartGeometry,
+    geom_type: Type[BaseGeometry],
+) -> List[BaseGeometry]:
+    # polygonize_full returns flat collections, so unlike extract_geometry_type
+    # there is nothing to recurse into
+    parts = list(collection.geoms)
+    for g in parts:
+        if not isinstance(g, geom_type):
+            error = f"expected {geom_type.__name__} but got {type(g).__name__}"
+            raise ValueError(error)
+    return parts
+
+
 def polygonize(
     lines: Iterable[Union[LineString, MultiLineString]],
     allow_dangles: bool = False,
@@ -35,22 +50,61 @@ def polygonize(
 ) -> Tuple[List[Polygon], List[LineString]]:
     # TODO: add option to try to fix dangles and invalids (e.g. with unary_union)
     polygons, dangles, cuts, invalids = polygonize_full(lines)
-    polygon_list = list(extract_geometry_type(polygons, Polygon))
-    line_list = list(extract_geometry_type(cuts, LineString))
+    polygon_list = _get_parts(polygons, Polygon)
+    line_list = _get_parts(cuts, LineString)
     if allow_dangles:
-        line_list.extend(extract_geometry_type(dangles, LineString))
-    elif len(dangles.geoms) > 0:
+        line_list.extend(_get_parts(dangles, LineString))
+    elif not dangles.is_empty:
         raise ValueError("detected dangling lines")
     if allow_invalids:
-        line_list.extend(extract_geometry_type(invalids, LineString))
-    elif len(invalids.geoms) > 0:
+        line_list.extend(_get_parts(invalids, LineString))
+    elif not invalids.is_empty:
         raise ValueError("detected invalid lines")
     return polygon_list, line_list
 
 
+def _get_signed_area(coords: np.ndarray) -> float:
+    # shoelace formula over the closed ring as two dot products, which avoids
+    # allocating the shifted copies of the coordinates
+    x, y = coords[:, 0], coords[:, 1]
+    return float(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1])) / 2.0
+
+
+def get_signed_area(ring: LinearRing) -> float:
+    return _get_signed_area(np.asarray(ring.coords))
+
+
+def _orient_ring(ring: LinearRing, sign: float) -> np.ndarray:
+    # reversing is a negative-stride view, the copy happens in GEOS
+    coords = np.asarray(ring.coords)
+    return coords if _get_signed_area(coords) * sign >= 0.0 else coords[::-1]
+
+
+def orient(polygon: Polygon, sign: float = 1.0) -> Polygon:
+    # same contract as shapely.geometry.polygon.orient, whose signed area
+    # is a pure Python loop over the ring coordinates
+    sign = float(sign)
+    shell = _orient_ring(polygon.exterior, sign)
+    holes = [_orient_ring(ring, -sign) for ring in polygon.interiors]
+    return Polygon(shell, holes)
+
+
 def validate_wgs84_coordinates(lon: float, lat: float) -> Tuple[float, float]:
     if lon is None or not -180 <= lon <= 180:
         raise ValueError("invalid longitude")
     if lat is None or not -90 <= lat <= 90:
         raise ValueError("invalid latitude")
     return lon, lat
+
+
+def validate_wgs84_coordinate_array(coords: np.ndarray) -> np.ndarray:
+    # vectorized counterpart of validate_wgs84_coordinates for (N, 2) arrays
+    # of (lon, lat) rows, missing values being represented as NaN
+    if coords.ndim != 2 or coords.shape[1] != 2:
+        raise ValueError("coordinates must be an (N, 2) array")
+    lon, lat = coords[:, 0], coords[:, 1]
+    if not np.all((lon >= -180) & (lon <= 180)):
+        raise ValueError("invalid longitude")
+    if not np.all((lat >= -90) & (lat <= 90)):
+        raise ValueError("invalid latitude")
+    return coords
@@ -1,16 +1,19 @@
 import math
 from functools import _CacheInfo, lru_cache
-from typing import Iterable, Optional, Sequence, Tuple
+from typing import Optional, Sequence, Tuple, Union
 
+import numpy as np
 import pyproj
 from h3.api import basic_int
 
 WGS84_CRS = pyproj.CRS("OGC:CRS84")
 WGS84_GEOD = WGS84_CRS.get_geod()
+WGS84_MEAN_RADIUS = (2 * WGS84_GEOD.a + WGS84_GEOD.b) / 3
 
 
 CoordinatesType = Tuple[float, float]
 CoordinatesSequenceType = Sequence[CoordinatesType]
+FloatOrArrayType = Union[float, np.ndarray]
 
 
 class TransformerLRUCache:
@@ -52,26 +55,26 @@ def get_wgs84_transformer(crs: pyproj.CRS = WGS84_CRS) -> pyproj.Transformer:
     return _WGS84_CACHE.get_transformer(crs_to=crs)
 
 
-def _mean(seq: Iterable[float]) -> float:
-    count = 0
-    total = 0
-    for x in seq:
-        count += 1
-        total += x
-    return total / count if count > 0 else math.nan
+def project_wgs84_to(
+    crs: pyproj.CRS,
+    coords: Union[CoordinatesSequenceType, np.ndarray],
+) -> np.ndarray:
+    # all the (lon, lat) rows go through PROJ in a single call
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    x, y = get_wgs84_transformer(crs).transform(coords[:, 0], coords[:, 1])
+    return np.column_stack((x, y))
 
 
 def get_geographic_centroid(coords: CoordinatesSequenceType) -> CoordinatesType:
-    lon_rad, lat_rad = zip(
-        *((math.radians(lon), math.radians(lat)) for lon, lat in coords)
-    )
-    lat_cos = tuple(math.cos(y) for y in lat_rad)
-    lon_cos = tuple(math.cos(x) for x in lon_rad)
-    lat_sin = tuple(math.sin(y) for y in lat_rad)
-    lon_sin = tuple(math.sin(x) for x in lon_rad)
-    x = _mean(a * b for a, b in zip(lat_cos, lon_cos))
-    y = _mean(a * b for a, b in zip(lat_cos, lon_sin))
-    z = _mean(lat_sin)
+    coords = np.radians(np.asarray(coords, dtype=np.float64).reshape(-1, 2))
+    if len(coords) == 0:
+        raise ValueError("cannot compute the centroid of empty coordinates")
+    lon_rad, lat_rad = coords[:, 0], coords[:, 1]
+    # sums instead of means: dividing by the count cancels out in atan2
+    lat_cos = np.cos(lat_rad)
+    x = float(np.dot(lat_cos, np.cos(lon_rad)))
+    y = float(np.dot(lat_cos, np.sin(lon_rad)))
+    z = float(np.sum(np.sin(lat_rad)))
     return (
         math.degrees(math.atan2(y, x)),
         math.degrees(math.atan2(z, math.sqrt(x**2 + y**2))),
@@ -85,21 +88,64 @@ def _h3_align(coords: CoordinatesType, h3_resolution: int) -> CoordinatesType:
     return lon, lat
 
 
-def get_azimuthal_equidistant_crs(
-    coords: CoordinatesSequenceType,
-    h3_resolution: Optional[int] = None,
-) -> pyproj.CRS:
+def _get_projection_center(
+    coords: Union[CoordinatesSequenceType, np.ndarray],
+    h3_resolution: Optional[int],
+) -> CoordinatesType:
+    # coordinates are converted once to a C-contiguous (N, 2) float64 array
+    coords = np.ascontiguousarray(coords, dtype=np.float64).reshape(-1, 2)
     lon_0, lat_0 = get_geographic_centroid(coords)
     if h3_resolution is not None:
         lon_0, lat_0 = _h3_align((lon_0, lat_0), h3_resolution)
-    return pyproj.CRS(projparams=dict(proj="aeqd", lat_0=lat_0, lon_0=lon_0))
+    return lon_0, lat_0
+
+
+@lru_cache(maxsize=128)
+def _get_azimuthal_crs(proj: str, lon_0: float, lat_0: float) -> pyproj.CRS:
+    # H3 aligned centers repeat exactly, so are the CRS (and their transformers)
+    return pyproj.CRS(projparams=dict(proj=proj, lat_0=lat_0, lon_0=lon_0))
+
+
+def get_azimuthal_equidistant_crs(
+    coords: Union[CoordinatesSequenceType, np.ndarray],
+    h3_resolution: Optional[int] = None,
+) -> pyproj.CRS:
+    lon_0, lat_0 = _get_projection_center(coords, h3_resolution)
+    return _get_azimuthal_crs("aeqd", lon_0, lat_0)
 
 
 def get_azimuthal_conformal_crs(
-    coords: CoordinatesSequenceType,
+    coords: Union[CoordinatesSequenceType, np.ndarray],
     h3_resolution: Optional[int] = None,
 ) -> pyproj.CRS:
-    lon_0, lat_0 = get_geographic_centroid(coords)
-    if h3_resolution is not None:
-        lon_0, lat_0 = _h3_align((lon_0, lat_0), h3_resolution)
-    return pyproj.CRS(projparams=dict(proj="stere", lat_0=lat_0, lon_0=lon_0))
+    lon_0, lat_0 = _get_projection_center(coords, h3_resolution)
+    return _get_azimuthal_crs("stere", lon_0, lat_0)
+
+
+def get_spherical_bearing(
+    lon1: FloatOrArrayType,
+    lat1: FloatOrArrayType,
+    lon2: FloatOrArrayType,
+    lat2: FloatOrArrayType,
+) -> FloatOrArrayType:
+    lon1, lat1, lon2, lat2 = map(np.radians, (lon1, lat1, lon2, lat2))
+    d_lon = lon2 - lon1
+    lat2_cos = np.cos(lat2)
+    y = np.sin(d_lon) * lat2_cos
+    x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * lat2_cos * np.cos(d_lon)
+    return np.degrees(np.arctan2(y, x))
+
+
+def get_haversine_distance(
+    lon1: FloatOrArrayType,
+    lat1: FloatOrArrayType,
+    lon2: FloatOrArrayType,
+    lat2: FloatOrArrayType,
+    radius: float = WGS84_MEAN_RADIUS,
+) -> FloatOrArrayType:
+    lon1, lat1, lon2, lat2 = map(np.radians, (lon1, lat1, lon2, lat2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * radius * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
@@ -1,7 +1,139 @@
-from hexmaps.earth.overpass.api import OverpassAPI
-from pytest import fixture
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import AnyStr, Callable, Dict, List, Tuple
+
+from hexmaps.earth.overpass.api import (
+    Elements,
+    FeaturesType,
+    OverpassAPI,
+    OverpassResult,
+    get_features,
+)
+from pytest import Config, FixtureRequest, Item, fixture, mark
+
+
+class CachedOverpassAPI(OverpassAPI):
+    # raw JSON responses are stored on disk keyed on the query, so that only
+    # the first test session has to reach the Overpass servers
+    def __init__(self, cache_dir: Path, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.cache_dir = cache_dir
+        self._local = threading.local()
+        # bodies already read in this process, results are parsed anew on
+        # every call since resolving missing elements mutates them
+        self._responses: Dict[bytes, bytes] = {}
+
+    @staticmethod
+    def canonicalize_query(query: AnyStr) -> bytes:
+        # runs of whitespace are collapsed so that reformatting a query
+        # literal does not change its cache key; the query itself is sent
+        # unchanged since whitespace matters in quoted values and comments
+        if isinstance(query, str):
+            query = query.encode("utf-8")
+        return b" ".join(query.split())
+
+    def get_cache_path(self, query: AnyStr) -> Path:
+        query = self.canonicalize_query(query)
+        digest = hashlib.blake2b(query, digest_size=16).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+
+    def parse_json(self, data: AnyStr, encoding: str = "utf-8") -> OverpassResult:
+        self._local.response = data
+        return super().parse_json(data, encoding=encoding)
+
+    def query(self, query: AnyStr) -> OverpassResult:
+        key = self.canonicalize_query(query)
+        try:
+            return self.parse_json(self._responses[key])
+        except KeyError:
+            pass
+        path = self.get_cache_path(key)
+        try:
+            response = path.read_bytes()
+        except FileNotFoundError:
+            pass
+        else:
+            self._responses[key] = response
+            return self.parse_json(response)
+        result = super().query(query)
+        response = self._local.response
+        if isinstance(response, str):
+            response = response.encode("utf-8")
+        # concurrent sessions (e.g. pytest-xdist workers) may fetch the same
+        # query, the file is replaced atomically so none reads a partial body
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, delete=False) as f:
+            f.write(response)
+        os.replace(f.name, path)
+        self._responses[key] = response
+        return result
+
+
+def _get_overpass_cache_dir(config: Config) -> Path:
+    return Path(config.cache.mkdir("overpass"))
+
+
+@fixture(scope="session")
+def overpass(request: FixtureRequest) -> OverpassAPI:
+    # coordinates are parsed as floats, OSM only stores 7 decimal digits
+    return CachedOverpassAPI(
+        cache_dir=_get_overpass_cache_dir(request.config),
+        use_decimal=False,
+    )
+
+
+# once a response is cached on disk only geometry construction is left to time
+_WARM_OVERPASS_TIMEOUT = 2
+
+
+def pytest_configure(config: Config) -> None:
+    config.addinivalue_line(
+        "markers",
+        "overpass_timeout(query, cold_timeout): time out after cold_timeout "
+        "seconds, or after a few seconds when the response to query is cached",
+    )
+
+
+def pytest_collection_modifyitems(config: Config, items: List[Item]) -> None:
+    # without the cache provider nothing is cached, so the budget stays cold
+    cache_dir = _get_overpass_cache_dir(config) if hasattr(config, "cache") else None
+    for item in items:
+        marker = item.get_closest_marker("overpass_timeout")
+        if marker is None:
+            continue
+        query, cold_timeout = marker.args
+        warm = (
+            cache_dir is not None
+            and CachedOverpassAPI(cache_dir=cache_dir).get_cache_path(query).exists()
+        )
+        item.add_marker(mark.timeout(_WARM_OVERPASS_TIMEOUT if warm else cold_timeout))
 
 
 @fixture(scope="session")
-def overpass() -> OverpassAPI:
-    return OverpassAPI()
+def features_of() -> Callable[..., FeaturesType]:
+    # features only depend on the elements and the build options, so each
+    # combination is built once per session whichever test asks first
+    cache: Dict[Tuple[int, bool, bool], Tuple[Elements, FeaturesType]] = {}
+
+    def build(
+        elements: Elements,
+        split_relations: bool = False,
+        resolve_missing: bool = False,
+    ) -> FeaturesType:
+        key = id(elements), split_relations, resolve_missing
+        try:
+            return cache[key][1]
+        except KeyError:
+            pass
+        features = get_features(
+            elements=elements,
+            resolve_missing=resolve_missing,
+            split_relations=split_relations,
+        )
+        # the elements are kept alive so that their id cannot be reused
+        cache[key] = elements, features
+        return features
+
+    return build
@@ -0,0 +1,175 @@
+import copy
+import json
+import pickle
+import threading
+import time
+from decimal import Decimal
+
+import overpy
+from hexmaps.earth.overpass.api import (
+    BBox,
+    OverpassAPI,
+    OverpassResult,
+    Recurse,
+    build_union_query,
+    get_element_counts,
+    get_elements,
+    get_features,
+)
+from hexmaps.earth.overpass.node import NodeFeature
+from pytest import raises
+
+
+def test_build_union_query():
+    query = build_union_query(
+        union_block="(rel(1););",
+        out={"geom", "body"},
+        bbox=BBox(west=1.0, south=2.0, east=3.0, north=4.0),
+        recurse=Recurse.DOWN,
+    )
+    assert query == "\n".join(
+        (
+            "[out:json][timeout:180][maxsize:536870912][bbox:2.0,1.0,4.0,3.0];",
+            "(rel(1););",
+            "(._; >;);",
+            "out body geom;",
+        )
+    )
+    assert build_union_query("(rel(1););", out=set()).endswith("\nout;")
+
+
+def test_get_features_keeps_element_order():
+    result = overpy.Result.from_json(
+        {
+            "elements": [
+                {"type": "node", "id": i, "lon": i / 10, "lat": i / 20}
+                for i in range(1, 50)
+            ]
+        }
+    )
+    elements = get_elements(result)
+    assert elements.nodes == result.get_nodes()
+    assert elements.ways == elements.relations == []
+    assert get_element_counts(result) == tuple(map(len, elements)) == (49, 0, 0)
+    serial, _, _ = get_features(elements)
+    threaded, _, _ = get_features(elements, resolve_missing=True, max_workers=4)
+    assert [f.id for f in threaded] == [f.id for f in serial] == list(range(1, 50))
+
+
+def test_node_features_from_elements():
+    result = overpy.Result.from_json(
+        {
+            "elements": [
+                {"type": "node", "id": 1, "lon": 2.5, "lat": 48.5},
+                {"type": "node", "id": 2, "lon": -73.5, "lat": 40.5},
+            ]
+        }
+    )
+    features = NodeFeature.from_elements(result.get_nodes())
+    expected = [NodeFeature.from_element(n) for n in result.get_nodes()]
+    assert [f.geometry for f in features] == [f.geometry for f in expected]
+    result.get_nodes()[0].lat = 91.0
+    with raises(ValueError):
+        NodeFeature.from_elements(result.get_nodes())
+
+
+def test_bbox_is_slotted_and_picklable():
+    bbox = BBox(west=1.0, south=2.0, east=3.0, north=4.0)
+    assert not hasattr(bbox, "__dict__")
+    assert pickle.loads(pickle.dumps(bbox)) == bbox
+    assert hash(bbox) == hash(BBox(1.0, 2.0, 3.0, 4.0))
+
+
+_NODE_JSON = b"""{
+  "elements": [
+    {"type": "node", "id": 1, "lat": 48.8566139, "lon": 2.3522219},
+    {"type": "node", "id": 2, "lat": -33.8688197, "lon": 151.2092955}
+  ]
+}"""
+
+
+def test_parse_json_floats():
+    result = OverpassAPI().parse_json(_NODE_JSON)
+    assert isinstance(result, OverpassResult)
+    node = result.get_node(1)
+    assert type(node.lat) is float and type(node.lon) is float
+    assert (node.lon, node.lat) == (2.3522219, 48.8566139)
+    assert f"{result.get_node(2).lat:.7f}" == "-33.8688197"
+
+
+def test_parse_json_decimals():
+    result = OverpassAPI(use_decimal=True).parse_json(_NODE_JSON)
+    node = result.get_node(2)
+    assert (node.lon, node.lat) == (Decimal("151.2092955"), Decimal("-33.8688197"))
+    assert NodeFeature.from_element(node).geometry.coords[0] == (
+        151.2092955,
+        -33.8688197,
+    )
+
+
+def test_feature_tags_are_read_only():
+    data = {"type": "node", "id": 1, "lat": 1.0, "lon": 2.0, "tags": {"a": "b"}}
+    node = overpy.Result.from_json({"elements": [data]}).get_node(1)
+    feature = NodeFeature.from_element(node)
+    assert feature.tags == {"a": "b"}
+    assert feature.get_properties() == {"element": "Node", "id": 1, "a": "b"}
+    with raises(TypeError):
+        feature.tags["a"] = "c"
+
+
+def test_features_are_picklable():
+    data = {"type": "node", "id": 1, "lat": 1.0, "lon": 2.0, "tags": {"a": "b"}}
+    node = overpy.Result.from_json({"elements": [data]}).get_node(1)
+    feature = NodeFeature.from_element(node)
+    for copied in (pickle.loads(pickle.dumps(feature)), copy.deepcopy(feature)):
+        assert copied.__geo_interface__ == feature.__geo_interface__
+        assert copied.attributes == feature.attributes
+        with raises(TypeError):
+            copied.tags["a"] = "c"
+
+
+def test_node_features_from_result():
+    result = OverpassAPI().parse_json(_NODE_JSON)
+    features = NodeFeature.from_result(result)
+    expected = NodeFeature.from_elements(result.get_nodes())
+    assert [f.id for f in features] == [f.id for f in expected] == [1, 2]
+    assert [f.geometry for f in features] == [f.geometry for f in expected]
+    assert [f.get_properties() for f in features] == [
+        f.get_properties() for f in expected
+    ]
+
+
+class _ConcurrencyAPI(OverpassAPI):
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+        self.running = self.max_running = 0
+        self.threads = set()
+
+    def query(self, query):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            self.threads.add(threading.get_ident())
+        time.sleep(0.01)
+        way_id = int(query.split("way(")[1].split(")")[0])
+        node = {"type": "node", "id": 100 + way_id, "lon": 1.0, "lat": 1.0}
+        with self.lock:
+            self.running -= 1
+        return self.parse_json(json.dumps({"elements": [node]}))
+
+
+def test_get_features_limits_concurrent_resolves():
+    nodes = [{"type": "node", "id": i, "lon": 0.0, "lat": i / 10} for i in range(9)]
+    ways = [{"type": "way", "id": i, "nodes": [i, 100 + i]} for i in range(8)]
+    for max_workers, max_running in ((None, 1), (16, 2)):
+        api = _ConcurrencyAPI()
+        result = api.parse_json(json.dumps({"elements": nodes + ways}))
+        elements = get_elements(result)._replace(nodes=[])
+        _, features, _ = get_features(
+            elements, resolve_missing=True, max_workers=max_workers
+        )
+        assert [f.geometry.coords[-1] for f in features] == [(1.0, 1.0)] * 8
+        assert api.max_running <= max_running
+        if max_workers is None:
+            assert api.threads == {threading.get_ident()}
@@ -0,0 +1,32 @@
+import io
+import json
+
+from hexmaps.earth.grid import Grid, Point
+from hexmaps.earth.spatial.geojson import (
+    GeoInterface,
+    get_feature_collection,
+    write_feature_collection,
+)
+from pytest import raises
+
+
+def test_write_feature_collection():
+    grid = Grid(height=3, width=4).expand_from_point(Point(2.3522, 48.8566), 7)
+    for geo in (grid, list(grid.values()), grid[0], []):
+        fp = io.StringIO()
+        write_feature_collection(geo, fp)
+        expected = json.loads(json.dumps(get_feature_collection(geo)))
+        assert json.loads(fp.getvalue()) == expected
+
+
+class _InvalidGeo(GeoInterface):
+    @property
+    def __geo_interface__(self):
+        return {"type": "Feature", "geometry": None}
+
+
+def test_feature_collection_validates_foreign_features():
+    point = Point(2.3522, 48.8566)
+    assert get_feature_collection([point])["features"] == [point.__geo_interface__]
+    with raises(ValueError):
+        get_feature_collection([point, _InvalidGeo()])
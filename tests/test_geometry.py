@@ -0,0 +1,29 @@
+from hexmaps.earth.spatial.geometry import get_signed_area, orient, polygonize
+from pytest import approx, mark
+from shapely.geometry import LineString, Polygon
+from shapely.geometry.polygon import orient as shapely_orient
+from shapely.geometry.polygon import signed_area as shapely_signed_area
+
+_SHELL = ((0.0, 0.0), (4.0, 0.5), (5.0, 3.0), (2.0, 6.0), (-1.0, 2.5))
+_HOLE = ((1.0, 1.0), (1.5, 3.0), (3.0, 2.5), (2.5, 1.0))
+
+
+@mark.parametrize("shell", [_SHELL, _SHELL[::-1]])
+@mark.parametrize("hole", [_HOLE, _HOLE[::-1]])
+@mark.parametrize("sign", [1.0, -1.0])
+def test_orient(shell, hole, sign):
+    polygon = Polygon(shell, [hole])
+    expected_area = shapely_signed_area(polygon.exterior)
+    assert get_signed_area(polygon.exterior) == approx(expected_area)
+    oriented = orient(polygon, sign=sign)
+    expected = shapely_orient(polygon, sign=sign)
+    assert list(oriented.exterior.coords) == list(expected.exterior.coords)
+    assert list(oriented.interiors[0].coords) == list(expected.interiors[0].coords)
+
+
+def test_polygonize():
+    ring = LineString(_SHELL + _SHELL[:1])
+    cut = LineString((_SHELL[0], (-3.0, -3.0)))
+    polygons, lines = polygonize([ring, cut])
+    assert len(polygons) == 1 and polygons[0].equals(Polygon(_SHELL))
+    assert len(lines) == 1 and lines[0].equals(cut)
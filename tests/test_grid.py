@@ -0,0 +1,180 @@
+import pickle
+
+import numpy as np
+from h3.api import basic_int
+from hexmaps.earth.grid import Cell, Grid, Neighbor, Point, geo_to_indexes
+from pytest import raises
+from shapely.geometry import mapping
+
+_RESOLUTION = 7
+_POINTS = (
+    Point(longitude=2.3522, latitude=48.8566),
+    Point(longitude=-73.9857, latitude=40.7484),
+    Point(longitude=139.6917, latitude=35.6895),
+)
+
+
+def test_geo_to_indexes():
+    indexes = geo_to_indexes(
+        np.array([p.latitude for p in _POINTS]),
+        np.array([p.longitude for p in _POINTS]),
+        _RESOLUTION,
+    )
+    assert indexes.dtype == np.uint64
+    assert indexes.tolist() == [p.get_index(_RESOLUTION) for p in _POINTS]
+
+
+def test_point_from_arrays():
+    latitudes = np.array([p.latitude for p in _POINTS])
+    longitudes = np.array([p.longitude for p in _POINTS])
+    assert list(Point.from_arrays(latitudes, longitudes)) == list(_POINTS)
+    with raises(ValueError):
+        Point.from_arrays(np.array([91.0]), np.array([0.0]))
+
+
+def test_grid_from_arrays():
+    grids = Grid.from_arrays(
+        np.array([p.latitude for p in _POINTS]),
+        np.array([p.longitude for p in _POINTS]),
+        _RESOLUTION,
+        height=3,
+        width=4,
+        bearing=30.0,
+    )
+    for grid, point in zip(grids, _POINTS):
+        expected = Grid(height=3, width=4, bearing=30.0)
+        expected.expand_from_point(point, _RESOLUTION)
+        assert dict(grid) == dict(expected)
+
+
+def test_geo_to_indexes_shape_mismatch():
+    with raises(ValueError):
+        geo_to_indexes(np.zeros(2), np.zeros(3), _RESOLUTION)
+
+
+def test_cell_from_indexes():
+    indexes = np.array([p.get_index(_RESOLUTION) for p in _POINTS], dtype=np.uint64)
+    cells = list(Cell.from_indexes(indexes))
+    assert cells == [Cell.from_point(p, _RESOLUTION) for p in _POINTS]
+    assert all(type(c.index) is int for c in cells)
+
+
+def test_neighbor_map_matches_geodesic_order():
+    coarse_point = Point(longitude=-96.42, latitude=57.65)
+    cells = [Cell.from_point(p, _RESOLUTION) for p in _POINTS]
+    cells += [Cell.from_point(coarse_point, r) for r in (0, 1, 2)]
+    for cell in cells:
+        for bearing in (0.0, 45.0, 200.0):
+            neighbor_map = cell.get_neighbor_map(bearing=bearing)
+            expected = sorted(
+                (n.cell for n in neighbor_map.values()),
+                key=lambda n: (cell.get_bearing(n) - bearing) % 360.0,
+            )
+            assert [n.cell for n in neighbor_map.values()] == expected
+            for neighbor in neighbor_map.values():
+                geodesic_angle = (cell.get_bearing(neighbor.cell) - bearing) % 360.0
+                assert neighbor.angle == geodesic_angle
+
+
+def test_grid_expand_from_point():
+    grid = Grid(height=12, width=15, bearing=30.0)
+    grid.expand_from_point(_POINTS[0], _RESOLUTION)
+    assert len(grid) == 12 * 15
+    assert len({c.cell for c in grid.values()}) == len(grid)
+    for key, grid_cell in grid.items():
+        assert grid_cell.key == key
+        assert grid.key_to_coordinates(key) == grid_cell.coordinates
+        assert grid[grid_cell.coordinates] is grid_cell
+    for grid_cell in grid.values():
+        i, j = grid_cell.coordinates
+        if 0 < i < grid.width - 1 and 0 < j < grid.height - 1:
+            ring = set(basic_int.hex_ring(grid_cell.cell.index, 1))
+            assert grid[i - 1, j].cell.index in ring
+            assert grid[i + 1, j].cell.index in ring
+
+
+def test_neighbor_validated():
+    cell = Cell.from_point(_POINTS[0], _RESOLUTION)
+    neighbor = Neighbor.validated(cell=cell, position=5, angle=359.0)
+    assert neighbor == Neighbor(cell=cell, position=5, angle=359.0)
+    with raises(ValueError):
+        Neighbor.validated(cell=cell, position=6, angle=0.0)
+    with raises(ValueError):
+        Neighbor.validated(cell=cell, position=0, angle=360.0)
+
+
+def test_features_are_slotted_and_picklable():
+    cell = Cell.from_point(_POINTS[0], _RESOLUTION)
+    neighbor = cell.get_neighbor_map()[0]
+    grid_cell = Grid(height=3, width=3).expand_from_cell(cell)[1, 1]
+    for feature in (_POINTS[0], cell, neighbor, grid_cell):
+        assert not hasattr(feature, "__dict__")
+        assert pickle.loads(pickle.dumps(feature)) == feature
+    assert pickle.loads(pickle.dumps(cell)).point == cell.point
+
+
+def test_grid_multipolygon_geometry():
+    grid = Grid(height=5, width=6).expand_from_point(_POINTS[1], _RESOLUTION)
+    geometry = grid.get_multipolygon_geometry()
+    assert geometry.is_valid
+    assert len(geometry.geoms) == 1
+    cells_area = sum(c.get_geometry().area for c in grid.values())
+    assert abs(geometry.area - cells_area) < 1e-9 * cells_area
+
+
+def test_cell_bulk_bearings_and_distances():
+    cell = Cell.from_point(_POINTS[0], _RESOLUTION)
+    others = [Cell.from_point(p, _RESOLUTION) for p in _POINTS[1:]]
+    bearings = cell.get_bearings(others)
+    distances = cell.get_distances(others)
+    assert bearings.shape == distances.shape == (len(others),)
+    for other, bearing, distance in zip(others, bearings, distances):
+        assert bearing == cell.get_bearing(other)
+        assert distance == cell.get_distance(other)
+    assert cell.get_distances([]).shape == (0,)
+
+
+def test_cell_spherical_bearings_and_distances():
+    cell = Cell.from_point(_POINTS[0], _RESOLUTION)
+    others = [Cell.from_point(p, _RESOLUTION) for p in _POINTS[1:]]
+    bearings = cell.get_bearings(others, geodesic=False)
+    distances = cell.get_distances(others, geodesic=False)
+    for other, bearing, distance in zip(others, bearings, distances):
+        assert bearing == cell.get_bearing(other, geodesic=False)
+        assert distance == cell.get_distance(other, geodesic=False)
+        assert abs(bearing - cell.get_bearing(other)) < 0.5
+        assert abs(distance / cell.get_distance(other) - 1) < 0.005
+
+
+def test_geometry_mapping_matches_shapely():
+    cell = Cell.from_point(_POINTS[2], _RESOLUTION)
+    grid = Grid(height=2, width=2).expand_from_cell(cell)
+    features = (_POINTS[2], cell, cell.get_neighbor_map()[3], grid[0])
+    for feature in features:
+        assert feature.get_geometry_mapping() == mapping(feature.get_geometry())
+
+
+def test_random_walker():
+    cell = Cell.from_point(_POINTS[0], _RESOLUTION)
+    walk = list(cell.get_random_walker(iterations=50, seed=42))
+    assert len(walk) == 50
+    assert walk == list(cell.get_random_walker(iterations=50, seed=42))
+    previous = cell
+    for neighbor in walk:
+        assert neighbor.cell.index in basic_int.hex_ring(previous.index, 1)
+        previous = neighbor.cell
+    endless = cell.get_random_walker(seed=42)
+    assert [next(endless) for _ in range(50)] == walk
+    long_walk = list(cell.get_random_walker(iterations=5000, seed=42))
+    assert len(long_walk) == 5000
+    endless = cell.get_random_walker(seed=42)
+    assert [next(endless) for _ in range(5000)] == long_walk
+
+
+def test_is_pentagon():
+    for resolution in (0, 7, 15):
+        for index in basic_int.get_pentagon_indexes(resolution):
+            assert Cell(index=index).is_pentagon
+            assert not Cell(index=index).get_neighbor_map()[0].cell.is_pentagon
+        with raises(ValueError):
+            Grid(height=3, width=3).expand_from_cell(Cell(index=index))
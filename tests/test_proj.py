@@ -0,0 +1,40 @@
+import numpy as np
+from hexmaps.earth.spatial.proj import (
+    get_azimuthal_conformal_crs,
+    get_azimuthal_equidistant_crs,
+    get_geographic_centroid,
+    get_wgs84_transformer,
+    project_wgs84_to,
+)
+from pytest import approx, raises
+
+
+def test_geographic_centroid():
+    assert get_geographic_centroid([(10.0, 0.0), (-10.0, 0.0)]) == approx((0, 0))
+    lon, lat = get_geographic_centroid([(179.0, 10.0), (-179.0, 10.0)])
+    assert abs(lon) == approx(180.0)
+    assert lat == approx(10.0, abs=0.01)
+    square = [(0.0, 89.0), (90.0, 89.0), (180.0, 89.0), (-90.0, 89.0)]
+    assert get_geographic_centroid(square)[1] == approx(90.0)
+    with raises(ValueError):
+        get_geographic_centroid([])
+
+
+def test_project_wgs84_to():
+    coords = np.array([(2.35, 48.85), (2.45, 48.9), (2.3, 48.8)])
+    crs = get_azimuthal_equidistant_crs(coords)
+    projected = project_wgs84_to(crs, coords)
+    assert projected.shape == coords.shape
+    transformer = get_wgs84_transformer(crs)
+    for (lon, lat), xy in zip(coords, projected):
+        assert tuple(xy) == approx(transformer.transform(lon, lat))
+    centroid = project_wgs84_to(crs, [get_geographic_centroid(coords)])
+    assert centroid[0] == approx((0.0, 0.0), abs=1e-6)
+
+
+def test_h3_aligned_crs_are_shared():
+    coords = [(2.35, 48.85), (2.36, 48.86)]
+    crs = get_azimuthal_conformal_crs(coords, h3_resolution=5)
+    assert get_azimuthal_conformal_crs(np.array(coords), h3_resolution=5) is crs
+    assert "+proj=stere" in crs.srs
+    assert "+proj=aeqd" in get_azimuthal_equidistant_crs(coords).srs
@@ -1,71 +1,243 @@
-from typing import List, Tuple
+import json
+from typing import Callable
 
 import overpy
-from hexmaps.earth.overpass.api import OverpassAPI, get_elements, get_features
-from pytest import fixture, mark
-
-ElementsType = Tuple[List[overpy.Node], List[overpy.Way], List[overpy.Element]]
+from hexmaps.earth.overpass.api import (
+    Elements,
+    FeaturesType,
+    OverpassAPI,
+    get_elements,
+)
+from hexmaps.earth.overpass.relation import (
+    RecursedRelation,
+    build_relation_geometry,
+    get_relation_coordinates,
+)
+from pytest import fixture, mark, raises
+
+ElementsType = Elements
+
+
+def _assert_element_counts(
+    elements: ElementsType,
+    node_count: int,
+    way_count: int,
+    relation_count: int,
+):
+    assert tuple(map(len, elements)) == (node_count, way_count, relation_count)
 
 
-def _test_elements(
-    elements: ElementsType,
+def _assert_feature_counts(
+    features: FeaturesType,
+    split_relations: bool,
     node_count: int,
     way_count: int,
     relation_count: int,
-    split_relations: bool = False,
 ):
-    nodes, ways, relations = elements
-    assert len(nodes) == node_count
-    assert len(ways) == way_count
-    assert len(relations) == relation_count
-    nodes_ft, ways_ft, relations_ft = get_features(
-        elements=elements,
-        resolve_missing=True,
-        split_relations=split_relations,
-    )
-    assert len(nodes_ft) == node_count
-    assert len(ways_ft) == way_count
+    nodes_ft, ways_ft, relations_ft = features
+    assert (len(nodes_ft), len(ways_ft)) == (node_count, way_count)
     if split_relations:
         assert relation_count <= len(relations_ft) <= relation_count * 3
     else:
         assert len(relations_ft) == relation_count
 
 
-_MULTIPOLYGON_QUERY = """[out:json];
+_MULTIPOLYGON_ID = 2327759
+_PUBLIC_TRANSPORT_ID = 7938390
+_RELATIONS_QUERY = f"""[out:json];
 (
-  rel(2327759);
+  rel({_MULTIPOLYGON_ID});
+  rel({_PUBLIC_TRANSPORT_ID});
 );
 out geom;"""
 
 
-@fixture(scope="module")
-def multipolygon_elements(overpass: OverpassAPI) -> ElementsType:
-    return get_elements(overpass.query(_MULTIPOLYGON_QUERY))
-
+# "out geom" inlines the geometry of most members, the others are resolved
+# with a single prefetch query per relation, cached on disk like any other
+@fixture(scope="session")
+def _all_relation_elements(overpass: OverpassAPI) -> ElementsType:
+    # both relations are fetched in a single round-trip to the Overpass API
+    return get_elements(overpass.query(_RELATIONS_QUERY))
 
-@mark.timeout(5)
-def test_multipolygon(multipolygon_elements: ElementsType):
-    _test_elements(multipolygon_elements, 0, 0, 1)
 
-
-_PUBLIC_TRANSPORT_QUERY = """[out:json];
-(
-  rel(7938390);
-);
-out geom;
-"""
-
-
-@fixture(scope="module")
-def public_transport_elements(overpass: OverpassAPI) -> ElementsType:
-    return get_elements(overpass.query(_PUBLIC_TRANSPORT_QUERY))
+def _select_relation(elements: ElementsType, relation_id: int) -> ElementsType:
+    return elements._replace(
+        relations=[r for r in elements.relations if r.id == relation_id]
+    )
 
 
-@mark.timeout(15)
-def test_public_transport(public_transport_elements: ElementsType):
-    _test_elements(public_transport_elements, 0, 0, 1)
+@fixture(scope="session")
+def multipolygon_elements(_all_relation_elements: ElementsType) -> ElementsType:
+    return _select_relation(_all_relation_elements, _MULTIPOLYGON_ID)
 
 
-@mark.timeout(15)
-def test_public_transport_split(public_transport_elements: ElementsType):
-    _test_elements(public_transport_elements, 0, 0, 1, split_relations=True)
+@mark.overpass_timeout(_RELATIONS_QUERY, 5)
+def test_multipolygon(
+    multipolygon_elements: ElementsType,
+    features_of: Callable[..., FeaturesType],
+):
+    _assert_element_counts(multipolygon_elements, 0, 0, 1)
+    features = features_of(multipolygon_elements, resolve_missing=True)
+    _assert_feature_counts(features, False, 0, 0, 1)
+
+
+def test_relation_member_coordinates_are_floats():
+    member = {
+        "type": "way",
+        "ref": 2,
+        "role": "",
+        "geometry": [{"lon": 2.1, "lat": 48.2}],
+    }
+    relation = {"type": "relation", "id": 1, "members": [member]}
+    api = OverpassAPI(use_decimal=False)
+    result = api.parse_json(json.dumps({"elements": [relation]}))
+    (geometry,) = result.get_relation(1).members[0].geometry
+    assert type(geometry.lon) is float and type(geometry.lat) is float
+
+
+@fixture(scope="session")
+def public_transport_elements(_all_relation_elements: ElementsType) -> ElementsType:
+    return _select_relation(_all_relation_elements, _PUBLIC_TRANSPORT_ID)
+
+
+@mark.overpass_timeout(_RELATIONS_QUERY, 15)
+@mark.parametrize("split_relations", [False, True])
+def test_public_transport(
+    public_transport_elements: ElementsType,
+    features_of: Callable[..., FeaturesType],
+    split_relations: bool,
+):
+    _assert_element_counts(public_transport_elements, 0, 0, 1)
+    features = features_of(
+        public_transport_elements,
+        split_relations=split_relations,
+        resolve_missing=True,
+    )
+    _assert_feature_counts(features, split_relations, 0, 0, 1)
+
+
+def _build_nested_relation() -> overpy.Relation:
+    square = ((0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0))
+
+    def way_member(ref, coordinates):
+        geometry = [{"lon": lon, "lat": lat} for lon, lat in coordinates]
+        return {"type": "way", "ref": ref, "role": "outer", "geometry": geometry}
+
+    def node_member(ref, lon, lat):
+        return {"type": "node", "ref": ref, "role": "", "lon": lon, "lat": lat}
+
+    data = {
+        "elements": [
+            {
+                "type": "relation",
+                "id": 1,
+                "members": [
+                    {"type": "relation", "ref": 2, "role": ""},
+                    node_member(10, 5.0, 5.0),
+                ],
+            },
+            {
+                "type": "relation",
+                "id": 2,
+                "members": [
+                    way_member(20, square[:3]),
+                    way_member(21, square[2:] + square[:1]),
+                    node_member(11, 6.0, 6.0),
+                ],
+            },
+        ]
+    }
+    return overpy.Result.from_json(data).get_relation(1)
+
+
+def test_nested_relation_geometry():
+    geometry = build_relation_geometry(_build_nested_relation())
+    point_11, point_10, polygon = geometry.geoms
+    assert (point_11.x, point_11.y) == (6.0, 6.0)
+    assert (point_10.x, point_10.y) == (5.0, 5.0)
+    assert polygon.geom_type == "Polygon"
+    assert polygon.area == 1.0
+    assert polygon.exterior.is_ccw
+
+
+def test_relation_unsupported_member():
+    result = overpy.Result.from_json({"elements": []})
+    members = [overpy.RelationArea(ref=3, role="", result=result)]
+    relation = overpy.Relation(rel_id=1, attributes={}, members=members)
+    with raises(ValueError):
+        build_relation_geometry(relation)
+
+
+def test_nested_relation_coordinates():
+    nodes, ways, relations = get_relation_coordinates(_build_nested_relation())
+    assert nodes == ((5.0, 5.0),)
+    assert ways == ()
+    ((child_nodes, child_ways, child_relations),) = relations
+    assert child_nodes == ((6.0, 6.0),)
+    assert len(child_ways) == 2 and child_relations == ()
+
+
+def test_relation_cycle():
+    members = [{"type": "relation", "ref": 1, "role": ""}]
+    data = {"elements": [{"type": "relation", "id": 1, "members": members}]}
+    with raises(ValueError):
+        build_relation_geometry(overpy.Result.from_json(data).get_relation(1))
+
+
+def test_relation_shared_way():
+    square = ((0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0), (0.0, 0.0))
+    geometry = [{"lon": lon, "lat": lat} for lon, lat in square]
+    way_member = {"type": "way", "ref": 20, "role": "", "geometry": geometry}
+    children = [{"type": "relation", "ref": i, "role": ""} for i in (2, 3)]
+    data = {
+        "elements": [
+            {"type": "relation", "id": 1, "members": children},
+            {"type": "relation", "id": 2, "members": [way_member]},
+            {"type": "relation", "id": 3, "members": [way_member]},
+        ]
+    }
+    relation = overpy.Result.from_json(data).get_relation(1)
+    polygons = build_relation_geometry(relation, repolygonize=False).geoms
+    assert len(polygons) == 2 and polygons[0].equals(polygons[1])
+    _, _, ((_, child_ways, _), (_, other_ways, _)) = get_relation_coordinates(relation)
+    assert child_ways[0] is other_ways[0]
+
+
+class _RecordingAPI(OverpassAPI):
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = responses
+        self.queries = []
+
+    def query(self, query):
+        self.queries.append(query)
+        return self.parse_json(json.dumps(self.responses.pop(0)))
+
+
+def test_relation_members_are_prefetched():
+    square = ((0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0))
+    nodes = [
+        {"type": "node", "id": i, "lon": lon, "lat": lat}
+        for i, (lon, lat) in enumerate(square)
+    ]
+    ways = [
+        {"type": "way", "id": 20, "nodes": [0, 1, 2]},
+        {"type": "way", "id": 21, "nodes": [2, 3, 0]},
+    ]
+    members = [{"type": "way", "ref": w["id"], "role": "outer"} for w in ways]
+    relation = {"type": "relation", "id": 1, "members": members}
+    api = _RecordingAPI([{"elements": nodes + ways}])
+    result = api.parse_json(json.dumps({"elements": [relation]}))
+    geometry = build_relation_geometry(result.get_relation(1), resolve_missing=True)
+    assert len(api.queries) == 1
+    assert "way(id:20,21);" in api.queries[0]
+    assert geometry.geoms[0].area == 1.0
+
+
+def test_relation_dict_tree():
+    relation = RecursedRelation(_build_nested_relation())
+    tree = relation.to_dict_tree()
+    assert list(tree) == [0, 1]
+    assert tree[0] == (relation, (1,))
+    assert tree[1] == (relation.relations[0], ())
+    assert list(relation.to_dict_tree(reverse=True)) == [1, 0]
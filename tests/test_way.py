@@ -0,0 +1,154 @@
+import json
+
+import numpy as np
+import overpy
+from hexmaps.earth.overpass import node
+from hexmaps.earth.overpass.api import OverpassAPI, get_elements, get_features
+from hexmaps.earth.overpass.way import (
+    WayFeature,
+    build_way_geometry,
+    get_way_coordinates,
+)
+from pytest import raises
+from shapely.geometry import LineString, Polygon, mapping
+
+_RING = ((2.0, 48.0), (2.1, 48.0), (2.1, 48.1), (2.0, 48.1), (2.0, 48.0))
+
+
+def _build_way(coordinates) -> overpy.Way:
+    data = {
+        "elements": [
+            {
+                "type": "way",
+                "id": 1,
+                "nodes": list(range(len(coordinates))),
+                "geometry": [{"lon": lon, "lat": lat} for lon, lat in coordinates],
+            }
+        ]
+    }
+    return overpy.Result.from_json(data).ways[0]
+
+
+def test_way_coordinates():
+    coords = get_way_coordinates(_build_way(_RING))
+    assert coords.dtype == np.float64
+    assert coords.tolist() == [list(c) for c in _RING]
+
+
+def test_way_invalid_coordinates():
+    way = _build_way(((2.0, 48.0), (2.0, 91.0)))
+    with raises(overpy.exception.DataIncomplete):
+        get_way_coordinates(way)
+
+
+def test_way_geometry():
+    polygon = build_way_geometry(_build_way(_RING))
+    assert isinstance(polygon, Polygon)
+    assert polygon.exterior.is_ccw
+    assert np.allclose(polygon.exterior.coords, _RING)
+    line = build_way_geometry(_build_way(_RING[:3]))
+    assert isinstance(line, LineString)
+    assert list(line.coords) == list(_RING[:3])
+
+
+def test_way_feature_geometry_is_memoized(monkeypatch):
+    way = _build_way(_RING)
+    feature = WayFeature.from_element(way)
+    assert WayFeature.from_element(way).geometry is feature.geometry
+    assert WayFeature.from_element(_build_way(_RING)).geometry is not feature.geometry
+    monkeypatch.setattr(WayFeature, "memoize_geometries", False)
+    assert WayFeature.from_element(way).geometry is not feature.geometry
+
+
+def test_open_way_geometry():
+    way = _build_way(_RING[:4])
+    for allow in (True, False):
+        geometry = build_way_geometry(way, allow_dangles=allow, allow_invalids=allow)
+        assert isinstance(geometry, LineString)
+        assert list(geometry.coords) == list(_RING[:4])
+
+
+def test_way_coordinates_from_result_nodes():
+    nodes = [
+        {"type": "node", "id": i, "lon": lon, "lat": lat}
+        for i, (lon, lat) in enumerate(_RING[:-1])
+    ]
+    ways = [
+        {"type": "way", "id": 1, "nodes": [0, 1, 2, 3, 0]},
+        {"type": "way", "id": 2, "nodes": [0, 1, 4]},
+    ]
+    result = overpy.Result.from_json({"elements": nodes + ways})
+    assert get_way_coordinates(result.get_way(1)).tolist() == [list(c) for c in _RING]
+    with raises(overpy.exception.DataIncomplete):
+        get_way_coordinates(result.get_way(2))
+    extra = {"type": "node", "id": 4, "lon": 3.0, "lat": 49.0}
+    result.expand(overpy.Result.from_json({"elements": [extra]}))
+    assert get_way_coordinates(result.get_way(2))[-1].tolist() == [3.0, 49.0]
+
+
+def test_way_feature_rejects_other_elements():
+    data = {"type": "node", "id": 1, "lon": 2.0, "lat": 48.0}
+    node = overpy.Result.from_json({"elements": [data]}).get_node(1)
+    with raises(ValueError):
+        WayFeature.from_element(node)
+    with raises(ValueError):
+        WayFeature(element=node, geometry=LineString(_RING))
+
+
+def test_self_intersecting_way_geometry():
+    bowtie = ((2.0, 48.0), (2.1, 48.1), (2.1, 48.0), (2.0, 48.1), (2.0, 48.0))
+    # not a ring, so it still goes through polygonize and its invalid lines
+    for allow in (True, False):
+        with raises(ValueError):
+            build_way_geometry(_build_way(bowtie), allow_invalids=allow)
+
+
+def test_way_feature_geometry_mapping_is_cached():
+    feature = WayFeature.from_element(_build_way(_RING))
+    data = feature.__geo_interface__
+    assert data["geometry"] == mapping(feature.geometry)
+    assert data["properties"] == {"element": "Way", "id": 1}
+    assert feature._geometry_mapping is feature._geometry_mapping
+    # editing a returned mapping leaves the feature untouched
+    data["geometry"]["type"] = "Point"
+    data["properties"]["id"] = 2
+    assert feature.__geo_interface__ == {
+        "type": "Feature",
+        "geometry": mapping(feature.geometry),
+        "properties": {"element": "Way", "id": 1},
+    }
+
+
+def test_degenerate_closed_way_geometry():
+    way = _build_way(_RING[:2] + _RING[:1])
+    with raises(ValueError, match="unexpected geometries"):
+        build_way_geometry(way, allow_invalids=True)
+    with raises(ValueError, match="invalid lines"):
+        build_way_geometry(way, allow_invalids=False)
+
+
+class _MissingNodeAPI(OverpassAPI):
+    def query(self, query):
+        # resolves the nodes of way n, the last of which is node 100 + n
+        way_id = int(query.split("way(")[1].split(")")[0])
+        ids = (way_id, way_id + 1, 100 + way_id)
+        elements = [{"type": "node", "id": i, "lon": i / 10, "lat": 1.0} for i in ids]
+        return self.parse_json(json.dumps({"elements": elements}))
+
+
+def test_way_coordinates_with_resolved_nodes():
+    api = _MissingNodeAPI()
+    nodes = [{"type": "node", "id": i, "lon": i / 10, "lat": 1.0} for i in range(9)]
+    ways = [{"type": "way", "id": i, "nodes": [i, i + 1, 100 + i]} for i in range(8)]
+    result = api.parse_json(json.dumps({"elements": nodes + ways}))
+    _, index = node._get_node_coordinate_index(result)
+    elements = get_elements(result)._replace(nodes=[])
+    _, features, _ = get_features(elements, resolve_missing=True)
+    for i, feature in enumerate(features):
+        expected = [(i / 10, 1.0), ((i + 1) / 10, 1.0), ((100 + i) / 10, 1.0)]
+        assert list(feature.geometry.coords) == expected
+    # the index of the result was extended in place rather than rebuilt
+    coords, extended = node._get_node_coordinate_index(result)
+    assert extended is index and len(index) == len(coords) == 9 + 8
+    for node_id, row in index.items():
+        assert coords[row].tolist() == [node_id / 10, 1.0]